@@ -5,12 +5,181 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://achrafmam2.github.io',
                 'git_url': 'https://github.com/achrafmam2/fastagent-hacking',
                 'lib_path': 'fastagent_hacking'},
-  'syms': { 'fastagent_hacking.channels': { 'fastagent_hacking.channels.Channel': ( 'channels.html#channel',
+  'syms': { 'fastagent_hacking.bench': { 'fastagent_hacking.bench.BenchReport': ('bench.html#benchreport', 'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench._LoopLagProbe': ( 'bench.html#_looplagprobe',
+                                                                                    'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench._LoopLagProbe.__init__': ( 'bench.html#_looplagprobe.__init__',
+                                                                                             'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench._LoopLagProbe._run': ( 'bench.html#_looplagprobe._run',
+                                                                                         'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench._LoopLagProbe.start': ( 'bench.html#_looplagprobe.start',
+                                                                                          'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench._LoopLagProbe.stop': ( 'bench.html#_looplagprobe.stop',
+                                                                                         'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench._run_pipeline': ( 'bench.html#_run_pipeline',
+                                                                                    'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench.bench_chat': ('bench.html#bench_chat', 'fastagent_hacking/bench.py'),
+                                         'fastagent_hacking.bench.percentile': ('bench.html#percentile', 'fastagent_hacking/bench.py')},
+            'fastagent_hacking.cache': { 'fastagent_hacking.cache.CacheEntry': ('cache.html#cacheentry', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.CacheEntry.from_json': ( 'cache.html#cacheentry.from_json',
+                                                                                           'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.CacheEntry.to_json': ( 'cache.html#cacheentry.to_json',
+                                                                                         'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.CachedBackend': ( 'cache.html#cachedbackend',
+                                                                                    'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.CachedBackend.__init__': ( 'cache.html#cachedbackend.__init__',
+                                                                                             'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.CachedBackend._fetch': ( 'cache.html#cachedbackend._fetch',
+                                                                                           'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.CachedBackend._lookup': ( 'cache.html#cachedbackend._lookup',
+                                                                                            'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.CachedBackend.chat': ( 'cache.html#cachedbackend.chat',
+                                                                                         'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.LRUCache': ('cache.html#lrucache', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.LRUCache.__init__': ( 'cache.html#lrucache.__init__',
+                                                                                        'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.LRUCache.__len__': ( 'cache.html#lrucache.__len__',
+                                                                                       'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.LRUCache.get': ('cache.html#lrucache.get', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.LRUCache.put': ('cache.html#lrucache.put', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.ResponseCache': ( 'cache.html#responsecache',
+                                                                                    'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.ResponseCache.get': ( 'cache.html#responsecache.get',
+                                                                                        'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.ResponseCache.put': ( 'cache.html#responsecache.put',
+                                                                                        'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.SqliteCache': ('cache.html#sqlitecache', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.SqliteCache.__init__': ( 'cache.html#sqlitecache.__init__',
+                                                                                           'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.SqliteCache._get': ( 'cache.html#sqlitecache._get',
+                                                                                       'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.SqliteCache._put': ( 'cache.html#sqlitecache._put',
+                                                                                       'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.SqliteCache.close': ( 'cache.html#sqlitecache.close',
+                                                                                        'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.SqliteCache.get': ( 'cache.html#sqlitecache.get',
+                                                                                      'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache.SqliteCache.put': ( 'cache.html#sqlitecache.put',
+                                                                                      'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Flight': ('cache.html#_flight', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Flight.__init__': ( 'cache.html#_flight.__init__',
+                                                                                       'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Flight._run': ('cache.html#_flight._run', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Flight.abandoned': ( 'cache.html#_flight.abandoned',
+                                                                                        'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Flight.chunks': ( 'cache.html#_flight.chunks',
+                                                                                     'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Flight.follow': ( 'cache.html#_flight.follow',
+                                                                                     'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Flight.put': ('cache.html#_flight.put', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Keyer': ('cache.html#_keyer', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Keyer.__call__': ( 'cache.html#_keyer.__call__',
+                                                                                      'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Keyer.__init__': ( 'cache.html#_keyer.__init__',
+                                                                                      'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Keyer._digest': ( 'cache.html#_keyer._digest',
+                                                                                     'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Renamer': ('cache.html#_renamer', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Renamer.__init__': ( 'cache.html#_renamer.__init__',
+                                                                                        'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Renamer.put': ('cache.html#_renamer.put', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._Renamer.shutdown': ( 'cache.html#_renamer.shutdown',
+                                                                                        'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._hash_content': ( 'cache.html#_hash_content',
+                                                                                    'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._msg_digest': ('cache.html#_msg_digest', 'fastagent_hacking/cache.py'),
+                                         'fastagent_hacking.cache._update': ('cache.html#_update', 'fastagent_hacking/cache.py')},
+            'fastagent_hacking.chanlog': { 'fastagent_hacking.chanlog.LogChannelWriter': ( 'chanlog.html#logchannelwriter',
+                                                                                           'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.__init__': ( 'chanlog.html#logchannelwriter.__init__',
+                                                                                                    'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter._apply_retention': ( 'chanlog.html#logchannelwriter._apply_retention',
+                                                                                                            'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter._new_segment': ( 'chanlog.html#logchannelwriter._new_segment',
+                                                                                                        'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter._roll': ( 'chanlog.html#logchannelwriter._roll',
+                                                                                                 'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter._sync_later': ( 'chanlog.html#logchannelwriter._sync_later',
+                                                                                                       'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.commit': ( 'chanlog.html#logchannelwriter.commit',
+                                                                                                  'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.committed': ( 'chanlog.html#logchannelwriter.committed',
+                                                                                                     'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.end_offset': ( 'chanlog.html#logchannelwriter.end_offset',
+                                                                                                      'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.put': ( 'chanlog.html#logchannelwriter.put',
+                                                                                               'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.read': ( 'chanlog.html#logchannelwriter.read',
+                                                                                                'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.readonly': ( 'chanlog.html#logchannelwriter.readonly',
+                                                                                                    'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.shutdown': ( 'chanlog.html#logchannelwriter.shutdown',
+                                                                                                    'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.sync': ( 'chanlog.html#logchannelwriter.sync',
+                                                                                                'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog.LogChannelWriter.synced_offset': ( 'chanlog.html#logchannelwriter.synced_offset',
+                                                                                                         'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog._Segment': ('chanlog.html#_segment', 'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog._Segment.__init__': ( 'chanlog.html#_segment.__init__',
+                                                                                            'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog._Segment.append': ( 'chanlog.html#_segment.append',
+                                                                                          'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog._Segment.close': ( 'chanlog.html#_segment.close',
+                                                                                         'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog._Segment.read': ( 'chanlog.html#_segment.read',
+                                                                                        'fastagent_hacking/chanlog.py'),
+                                           'fastagent_hacking.chanlog._Segment.scan': ( 'chanlog.html#_segment.scan',
+                                                                                        'fastagent_hacking/chanlog.py')},
+            'fastagent_hacking.channels': { 'fastagent_hacking.channels.BloomIndex': ( 'channels.html#bloomindex',
+                                                                                       'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex.__contains__': ( 'channels.html#bloomindex.__contains__',
+                                                                                                    'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex.__init__': ( 'channels.html#bloomindex.__init__',
+                                                                                                'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex._has': ( 'channels.html#bloomindex._has',
+                                                                                            'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex._new_gen': ( 'channels.html#bloomindex._new_gen',
+                                                                                                'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex._positions': ( 'channels.html#bloomindex._positions',
+                                                                                                  'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex._rotate': ( 'channels.html#bloomindex._rotate',
+                                                                                               'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex.add': ( 'channels.html#bloomindex.add',
+                                                                                           'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex.fp_rate': ( 'channels.html#bloomindex.fp_rate',
+                                                                                               'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.BloomIndex.nbytes': ( 'channels.html#bloomindex.nbytes',
+                                                                                              'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.Channel': ( 'channels.html#channel',
                                                                                     'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.ChannelWriter': ( 'channels.html#channelwriter',
                                                                                           'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.ChannelWriter.readonly': ( 'channels.html#channelwriter.readonly',
                                                                                                    'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.DedupIndex': ( 'channels.html#dedupindex',
+                                                                                       'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.DedupIndex.__contains__': ( 'channels.html#dedupindex.__contains__',
+                                                                                                    'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.DedupIndex.add': ( 'channels.html#dedupindex.add',
+                                                                                           'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.DedupIndex.fp_rate': ( 'channels.html#dedupindex.fp_rate',
+                                                                                               'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.DedupIndex.nbytes': ( 'channels.html#dedupindex.nbytes',
+                                                                                              'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.ExactIndex': ( 'channels.html#exactindex',
+                                                                                       'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.ExactIndex.__contains__': ( 'channels.html#exactindex.__contains__',
+                                                                                                    'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.ExactIndex.__init__': ( 'channels.html#exactindex.__init__',
+                                                                                                'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.ExactIndex.__len__': ( 'channels.html#exactindex.__len__',
+                                                                                               'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.ExactIndex._expire': ( 'channels.html#exactindex._expire',
+                                                                                               'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.ExactIndex.add': ( 'channels.html#exactindex.add',
+                                                                                           'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.ExactIndex.nbytes': ( 'channels.html#exactindex.nbytes',
+                                                                                              'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.Packet': ('channels.html#packet', 'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.Packet.__lt__': ( 'channels.html#packet.__lt__',
                                                                                           'fastagent_hacking/channels.py'),
@@ -22,64 +191,380 @@ d = { 'settings': { 'branch': 'main',
                                                                                            'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.PacketType': ( 'channels.html#packettype',
                                                                                        'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._Buckets': ( 'channels.html#_buckets',
+                                                                                     'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._Buckets.__init__': ( 'channels.html#_buckets.__init__',
+                                                                                              'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._Buckets.__iter__': ( 'channels.html#_buckets.__iter__',
+                                                                                              'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._Buckets.__len__': ( 'channels.html#_buckets.__len__',
+                                                                                             'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._Buckets.append': ( 'channels.html#_buckets.append',
+                                                                                            'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._Buckets.popleft': ( 'channels.html#_buckets.popleft',
+                                                                                             'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._PacketQueue': ( 'channels.html#_packetqueue',
+                                                                                         'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._PacketQueue._init': ( 'channels.html#_packetqueue._init',
+                                                                                               'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels._current_time_ms': ( 'channels.html#_current_time_ms',
                                                                                              'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._digest': ( 'channels.html#_digest',
+                                                                                    'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels._print_task_errors': ( 'channels.html#_print_task_errors',
                                                                                                'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels._write_key': ( 'channels.html#_write_key',
+                                                                                       'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.as_chan': ( 'channels.html#as_chan',
                                                                                     'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.as_chan_writer': ( 'channels.html#as_chan_writer',
                                                                                            'fastagent_hacking/channels.py'),
+                                            'fastagent_hacking.channels.dedup_key': ( 'channels.html#dedup_key',
+                                                                                      'fastagent_hacking/channels.py'),
                                             'fastagent_hacking.channels.mk_cancellation_packet': ( 'channels.html#mk_cancellation_packet',
                                                                                                    'fastagent_hacking/channels.py')},
+            'fastagent_hacking.codec': { 'fastagent_hacking.codec.EncodedImage': ('codec.html#encodedimage', 'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec.EncodedImage.image': ( 'codec.html#encodedimage.image',
+                                                                                         'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec._decode_frame': ( 'codec.html#_decode_frame',
+                                                                                    'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec._decode_leaf': ('codec.html#_decode_leaf', 'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec._encode_image': ( 'codec.html#_encode_image',
+                                                                                    'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec._encode_leaf': ('codec.html#_encode_leaf', 'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec.decode': ('codec.html#decode', 'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec.dump': ('codec.html#dump', 'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec.encode': ('codec.html#encode', 'fastagent_hacking/codec.py'),
+                                         'fastagent_hacking.codec.iter_decode': ('codec.html#iter_decode', 'fastagent_hacking/codec.py')},
+            'fastagent_hacking.fakes': { 'fastagent_hacking.fakes.FakeBackend': ('fakes.html#fakebackend', 'fastagent_hacking/fakes.py'),
+                                         'fastagent_hacking.fakes.FakeBackend.__init__': ( 'fakes.html#fakebackend.__init__',
+                                                                                           'fastagent_hacking/fakes.py'),
+                                         'fastagent_hacking.fakes.FakeBackend._chunks': ( 'fakes.html#fakebackend._chunks',
+                                                                                          'fastagent_hacking/fakes.py'),
+                                         'fastagent_hacking.fakes.FakeBackend.chat': ( 'fakes.html#fakebackend.chat',
+                                                                                       'fastagent_hacking/fakes.py'),
+                                         'fastagent_hacking.fakes.FakeBackend.model': ( 'fakes.html#fakebackend.model',
+                                                                                        'fastagent_hacking/fakes.py'),
+                                         'fastagent_hacking.fakes._echo': ('fakes.html#_echo', 'fastagent_hacking/fakes.py'),
+                                         'fastagent_hacking.fakes._tokenize': ('fakes.html#_tokenize', 'fastagent_hacking/fakes.py')},
+            'fastagent_hacking.history': { 'fastagent_hacking.history.LogHistoryStore': ( 'history.html#loghistorystore',
+                                                                                          'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history.LogHistoryStore.__init__': ( 'history.html#loghistorystore.__init__',
+                                                                                                   'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history.LogHistoryStore._append': ( 'history.html#loghistorystore._append',
+                                                                                                  'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history.LogHistoryStore._load': ( 'history.html#loghistorystore._load',
+                                                                                                'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history.LogHistoryStore._load_index': ( 'history.html#loghistorystore._load_index',
+                                                                                                      'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history.LogHistoryStore.append': ( 'history.html#loghistorystore.append',
+                                                                                                 'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history.LogHistoryStore.close': ( 'history.html#loghistorystore.close',
+                                                                                                'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history.LogHistoryStore.load': ( 'history.html#loghistorystore.load',
+                                                                                               'fastagent_hacking/history.py'),
+                                           'fastagent_hacking.history._session_key': ( 'history.html#_session_key',
+                                                                                       'fastagent_hacking/history.py')},
             'fastagent_hacking.llms': { 'fastagent_hacking.llms.Backend': ('llms.html#backend', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Backend._embed': ('llms.html#backend._embed', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Backend._embed_batcher': ( 'llms.html#backend._embed_batcher',
+                                                                                           'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.Backend.chat': ('llms.html#backend.chat', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Backend.chat_batch': ( 'llms.html#backend.chat_batch',
+                                                                                       'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Backend.embed': ('llms.html#backend.embed', 'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.Chat': ('llms.html#chat', 'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.Chat.__call__': ('llms.html#chat.__call__', 'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.Chat.__init__': ('llms.html#chat.__init__', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Chat._load': ('llms.html#chat._load', 'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.Chat._merge_content': ( 'llms.html#chat._merge_content',
                                                                                         'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.Chat.chat': ('llms.html#chat.chat', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Chat.flush': ('llms.html#chat.flush', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ClientPool': ('llms.html#clientpool', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ClientPool.__init__': ( 'llms.html#clientpool.__init__',
+                                                                                        'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ClientPool._entry': ( 'llms.html#clientpool._entry',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ClientPool.aclose': ( 'llms.html#clientpool.aclose',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ClientPool.client': ( 'llms.html#clientpool.client',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ClientPool.stats': ( 'llms.html#clientpool.stats',
+                                                                                     'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ClientPool.warm': ( 'llms.html#clientpool.warm',
+                                                                                    'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Embed': ('llms.html#embed', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Embed.__call__': ('llms.html#embed.__call__', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Embed.__init__': ('llms.html#embed.__init__', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.Embed.embed': ('llms.html#embed.embed', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.HistoryStore': ('llms.html#historystore', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.HistoryStore.append': ( 'llms.html#historystore.append',
+                                                                                        'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.HistoryStore.load': ( 'llms.html#historystore.load',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ImageOptions': ('llms.html#imageoptions', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonEvent': ('llms.html#jsonevent', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser': ('llms.html#jsonparser', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser.__init__': ( 'llms.html#jsonparser.__init__',
+                                                                                        'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser._add': ( 'llms.html#jsonparser._add',
+                                                                                    'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser._complete': ( 'llms.html#jsonparser._complete',
+                                                                                         'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser._end_scalar': ( 'llms.html#jsonparser._end_scalar',
+                                                                                           'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser._end_string': ( 'llms.html#jsonparser._end_string',
+                                                                                           'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser._error': ( 'llms.html#jsonparser._error',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser._scan_string': ( 'llms.html#jsonparser._scan_string',
+                                                                                            'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser.close': ( 'llms.html#jsonparser.close',
+                                                                                     'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.JsonParser.feed': ( 'llms.html#jsonparser.feed',
+                                                                                    'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.Msg': ('llms.html#msg', 'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.MsgChunk': ('llms.html#msgchunk', 'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.OpenaiAPI': ('llms.html#openaiapi', 'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.OpenaiAPI.__init__': ( 'llms.html#openaiapi.__init__',
                                                                                        'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._chat_batch': ( 'llms.html#openaiapi._chat_batch',
+                                                                                          'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._client': ( 'llms.html#openaiapi._client',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._embed': ( 'llms.html#openaiapi._embed',
+                                                                                     'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._encode_images': ( 'llms.html#openaiapi._encode_images',
+                                                                                             'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._image_to_encode': ( 'llms.html#openaiapi._image_to_encode',
+                                                                                               'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._leaves': ( 'llms.html#openaiapi._leaves',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._record_pool': ( 'llms.html#openaiapi._record_pool',
+                                                                                           'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._to_batch_line': ( 'llms.html#openaiapi._to_batch_line',
+                                                                                             'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.OpenaiAPI._to_openai_msg': ( 'llms.html#openaiapi._to_openai_msg',
                                                                                              'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI._wait_batch': ( 'llms.html#openaiapi._wait_batch',
+                                                                                          'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms.OpenaiAPI.chat': ('llms.html#openaiapi.chat', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI.chat_batch': ( 'llms.html#openaiapi.chat_batch',
+                                                                                         'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.OpenaiAPI.model': ( 'llms.html#openaiapi.model',
+                                                                                    'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ParseJson': ('llms.html#parsejson', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ParseJson.__call__': ( 'llms.html#parsejson.__call__',
+                                                                                       'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.ParseJson.__init__': ( 'llms.html#parsejson.__init__',
+                                                                                       'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.PoolStats': ('llms.html#poolstats', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._BatchCheckpoint': ( 'llms.html#_batchcheckpoint',
+                                                                                     'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._BatchCheckpoint.__init__': ( 'llms.html#_batchcheckpoint.__init__',
+                                                                                              'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._BatchCheckpoint.add_job': ( 'llms.html#_batchcheckpoint.add_job',
+                                                                                             'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._BatchCheckpoint.job': ( 'llms.html#_batchcheckpoint.job',
+                                                                                         'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._EmbedBatcher': ('llms.html#_embedbatcher', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._EmbedBatcher.__init__': ( 'llms.html#_embedbatcher.__init__',
+                                                                                           'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._EmbedBatcher._flush': ( 'llms.html#_embedbatcher._flush',
+                                                                                         'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._EmbedBatcher._run': ( 'llms.html#_embedbatcher._run',
+                                                                                       'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._EmbedBatcher._schedule': ( 'llms.html#_embedbatcher._schedule',
+                                                                                            'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._EmbedBatcher.embed': ( 'llms.html#_embedbatcher.embed',
+                                                                                        'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._dataclass_json': ( 'llms.html#_dataclass_json',
+                                                                                    'fastagent_hacking/llms.py'),
                                         'fastagent_hacking.llms._decode': ('llms.html#_decode', 'fastagent_hacking/llms.py'),
-                                        'fastagent_hacking.llms._encode': ('llms.html#_encode', 'fastagent_hacking/llms.py')},
+                                        'fastagent_hacking.llms._encode': ('llms.html#_encode', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._has_alpha': ('llms.html#_has_alpha', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._is_encoded_image': ( 'llms.html#_is_encoded_image',
+                                                                                      'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._is_image': ('llms.html#_is_image', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._lazy_import': ('llms.html#_lazy_import', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms._scale': ('llms.html#_scale', 'fastagent_hacking/llms.py'),
+                                        'fastagent_hacking.llms.encode_image': ('llms.html#encode_image', 'fastagent_hacking/llms.py')},
+            'fastagent_hacking.metrics': { 'fastagent_hacking.metrics.Histogram': ( 'metrics.html#histogram',
+                                                                                    'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Histogram.mean': ( 'metrics.html#histogram.mean',
+                                                                                         'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Histogram.observe': ( 'metrics.html#histogram.observe',
+                                                                                            'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Histogram.percentile': ( 'metrics.html#histogram.percentile',
+                                                                                               'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder': ('metrics.html#recorder', 'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder.__init__': ( 'metrics.html#recorder.__init__',
+                                                                                            'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder.count': ( 'metrics.html#recorder.count',
+                                                                                         'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder.end_span': ( 'metrics.html#recorder.end_span',
+                                                                                            'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder.high_water_mark': ( 'metrics.html#recorder.high_water_mark',
+                                                                                                   'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder.observe': ( 'metrics.html#recorder.observe',
+                                                                                           'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder.snapshot': ( 'metrics.html#recorder.snapshot',
+                                                                                            'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Recorder.start_span': ( 'metrics.html#recorder.start_span',
+                                                                                              'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Span': ('metrics.html#span', 'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.Span.to_otel': ( 'metrics.html#span.to_otel',
+                                                                                       'fastagent_hacking/metrics.py'),
+                                           'fastagent_hacking.metrics.recording': ( 'metrics.html#recording',
+                                                                                    'fastagent_hacking/metrics.py')},
+            'fastagent_hacking.profiler': { 'fastagent_hacking.profiler.Profiler': ( 'profiler.html#profiler',
+                                                                                     'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.Profiler.__init__': ( 'profiler.html#profiler.__init__',
+                                                                                              'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.Profiler.record': ( 'profiler.html#profiler.record',
+                                                                                            'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.Profiler.record_handoff': ( 'profiler.html#profiler.record_handoff',
+                                                                                                    'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.Profiler.report': ( 'profiler.html#profiler.report',
+                                                                                            'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.Profiler.timed': ( 'profiler.html#profiler.timed',
+                                                                                           'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.Profiler.timed_call': ( 'profiler.html#profiler.timed_call',
+                                                                                                'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.StageProfile': ( 'profiler.html#stageprofile',
+                                                                                         'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler._Timed': ('profiler.html#_timed', 'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler._Timed.__await__': ( 'profiler.html#_timed.__await__',
+                                                                                             'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler._Timed.__init__': ( 'profiler.html#_timed.__init__',
+                                                                                            'fastagent_hacking/profiler.py'),
+                                            'fastagent_hacking.profiler.profiling': ( 'profiler.html#profiling',
+                                                                                      'fastagent_hacking/profiler.py')},
+            'fastagent_hacking.ratelimit': { 'fastagent_hacking.ratelimit.LimiterStats': ( 'ratelimit.html#limiterstats',
+                                                                                           'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.LimiterStats.mean_wait_s': ( 'ratelimit.html#limiterstats.mean_wait_s',
+                                                                                                       'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.Priority': ( 'ratelimit.html#priority',
+                                                                                       'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimitedBackend': ( 'ratelimit.html#ratelimitedbackend',
+                                                                                                 'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimitedBackend.__init__': ( 'ratelimit.html#ratelimitedbackend.__init__',
+                                                                                                          'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimitedBackend.chat': ( 'ratelimit.html#ratelimitedbackend.chat',
+                                                                                                      'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimiter': ( 'ratelimit.html#ratelimiter',
+                                                                                          'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimiter.__init__': ( 'ratelimit.html#ratelimiter.__init__',
+                                                                                                   'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimiter._dispatch': ( 'ratelimit.html#ratelimiter._dispatch',
+                                                                                                    'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimiter._release': ( 'ratelimit.html#ratelimiter._release',
+                                                                                                   'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimiter.acquire': ( 'ratelimit.html#ratelimiter.acquire',
+                                                                                                  'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimiter.debit': ( 'ratelimit.html#ratelimiter.debit',
+                                                                                                'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit.RateLimiter.stats': ( 'ratelimit.html#ratelimiter.stats',
+                                                                                                'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit._TokenBucket': ( 'ratelimit.html#_tokenbucket',
+                                                                                           'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit._TokenBucket.__init__': ( 'ratelimit.html#_tokenbucket.__init__',
+                                                                                                    'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit._TokenBucket._refill': ( 'ratelimit.html#_tokenbucket._refill',
+                                                                                                   'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit._TokenBucket.delay': ( 'ratelimit.html#_tokenbucket.delay',
+                                                                                                 'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit._TokenBucket.take': ( 'ratelimit.html#_tokenbucket.take',
+                                                                                                'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit._Waiter': ( 'ratelimit.html#_waiter',
+                                                                                      'fastagent_hacking/ratelimit.py'),
+                                             'fastagent_hacking.ratelimit._estimate_tokens': ( 'ratelimit.html#_estimate_tokens',
+                                                                                               'fastagent_hacking/ratelimit.py')},
+            'fastagent_hacking.resilience': { 'fastagent_hacking.resilience.ResilientBackend': ( 'resilience.html#resilientbackend',
+                                                                                                 'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience.ResilientBackend.__init__': ( 'resilience.html#resilientbackend.__init__',
+                                                                                                          'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience.ResilientBackend._backoff': ( 'resilience.html#resilientbackend._backoff',
+                                                                                                          'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience.ResilientBackend.chat': ( 'resilience.html#resilientbackend.chat',
+                                                                                                      'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._Candidate': ( 'resilience.html#_candidate',
+                                                                                           'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._Candidate.__init__': ( 'resilience.html#_candidate.__init__',
+                                                                                                    'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._Candidate.promote': ( 'resilience.html#_candidate.promote',
+                                                                                                   'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._Candidate.put': ( 'resilience.html#_candidate.put',
+                                                                                               'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._Forwarder': ( 'resilience.html#_forwarder',
+                                                                                           'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._Forwarder.__init__': ( 'resilience.html#_forwarder.__init__',
+                                                                                                    'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._Forwarder.put': ( 'resilience.html#_forwarder.put',
+                                                                                               'fastagent_hacking/resilience.py'),
+                                              'fastagent_hacking.resilience._race': ( 'resilience.html#_race',
+                                                                                      'fastagent_hacking/resilience.py')},
             'fastagent_hacking.streams': { 'fastagent_hacking.streams.InMemStreamWriter': ( 'streams.html#inmemstreamwriter',
                                                                                             'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.InMemStreamWriter.__init__': ( 'streams.html#inmemstreamwriter.__init__',
                                                                                                      'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.InMemStreamWriter._record_put': ( 'streams.html#inmemstreamwriter._record_put',
+                                                                                                        'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.InMemStreamWriter.put': ( 'streams.html#inmemstreamwriter.put',
                                                                                                 'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.InMemStreamWriter.readonly': ( 'streams.html#inmemstreamwriter.readonly',
                                                                                                      'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.InMemStreamWriter.shutdown': ( 'streams.html#inmemstreamwriter.shutdown',
                                                                                                      'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.Sink': ('streams.html#sink', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.Sink.put': ('streams.html#sink.put', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.Sink.shutdown': ( 'streams.html#sink.shutdown',
+                                                                                        'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.Stream': ('streams.html#stream', 'fastagent_hacking/streams.py'),
-                                           'fastagent_hacking.streams.Stream.__add__': ( 'streams.html#stream.__add__',
-                                                                                         'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.Stream.__aiter__': ( 'streams.html#stream.__aiter__',
                                                                                            'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.Stream.__anext__': ( 'streams.html#stream.__anext__',
                                                                                            'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.Stream.aclose': ( 'streams.html#stream.aclose',
+                                                                                        'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.Stream.next': ( 'streams.html#stream.next',
                                                                                       'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.StreamStatus': ( 'streams.html#streamstatus',
                                                                                        'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.StreamWriter': ( 'streams.html#streamwriter',
                                                                                        'fastagent_hacking/streams.py'),
-                                           'fastagent_hacking.streams.StreamWriter.put': ( 'streams.html#streamwriter.put',
-                                                                                           'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.StreamWriter.readonly': ( 'streams.html#streamwriter.readonly',
                                                                                                 'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.StreamWriter.shutdown': ( 'streams.html#streamwriter.shutdown',
                                                                                                 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._TaskStream': ( 'streams.html#_taskstream',
+                                                                                      'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._TaskStream.__init__': ( 'streams.html#_taskstream.__init__',
+                                                                                               'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._TaskStream.aclose': ( 'streams.html#_taskstream.aclose',
+                                                                                             'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._TaskStream.next': ( 'streams.html#_taskstream.next',
+                                                                                           'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._aclose_all': ( 'streams.html#_aclose_all',
+                                                                                      'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._call_in_process': ( 'streams.html#_call_in_process',
+                                                                                           'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._first': ('streams.html#_first', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._offloaded': ( 'streams.html#_offloaded',
+                                                                                     'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._profiled': ( 'streams.html#_profiled',
+                                                                                    'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._resolve_executor': ( 'streams.html#_resolve_executor',
+                                                                                            'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams._stream_add': ( 'streams.html#_stream_add',
+                                                                                      'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.concat': ('streams.html#concat', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.cur_deadline': ( 'streams.html#cur_deadline',
+                                                                                       'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.deadline': ('streams.html#deadline', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.deadline_exceeded': ( 'streams.html#deadline_exceeded',
+                                                                                            'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.filter': ('streams.html#filter', 'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.flatten': ('streams.html#flatten', 'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.fork': ('streams.html#fork', 'fastagent_hacking/streams.py'),
@@ -88,14 +573,37 @@ d = { 'settings': { 'branch': 'main',
                                            'fastagent_hacking.streams.map': ('streams.html#map', 'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.mix': ('streams.html#mix', 'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.of': ('streams.html#of', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.race': ('streams.html#race', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.remaining': ( 'streams.html#remaining',
+                                                                                    'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.streamify': ( 'streams.html#streamify',
                                                                                     'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.take': ('streams.html#take', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.take_until': ( 'streams.html#take_until',
+                                                                                     'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.timeout': ('streams.html#timeout', 'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.tolist': ('streams.html#tolist', 'fastagent_hacking/streams.py'),
+                                           'fastagent_hacking.streams.until_deadline': ( 'streams.html#until_deadline',
+                                                                                         'fastagent_hacking/streams.py'),
                                            'fastagent_hacking.streams.zip': ('streams.html#zip', 'fastagent_hacking/streams.py')},
             'fastagent_hacking.transforms': { 'fastagent_hacking.transforms.CancelPrev': ( 'transforms.html#cancelprev',
                                                                                            'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.CancelPrev.__call__': ( 'transforms.html#cancelprev.__call__',
                                                                                                     'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.CancelPrev.__init__': ( 'transforms.html#cancelprev.__init__',
+                                                                                                    'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Debounce': ( 'transforms.html#debounce',
+                                                                                         'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Debounce.__init__': ( 'transforms.html#debounce.__init__',
+                                                                                                  'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Debounce._due': ( 'transforms.html#debounce._due',
+                                                                                              'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Dedup': ( 'transforms.html#dedup',
+                                                                                      'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Dedup.__call__': ( 'transforms.html#dedup.__call__',
+                                                                                               'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Dedup.__init__': ( 'transforms.html#dedup.__init__',
+                                                                                               'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.Event': ( 'transforms.html#event',
                                                                                       'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.ParDo': ( 'transforms.html#pardo',
@@ -108,6 +616,12 @@ d = { 'settings': { 'branch': 'main',
                                                                                                       'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.ParDo._proc_packet': ( 'transforms.html#pardo._proc_packet',
                                                                                                    'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Sample': ( 'transforms.html#sample',
+                                                                                       'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Sample.__init__': ( 'transforms.html#sample.__init__',
+                                                                                                'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Sample._due': ( 'transforms.html#sample._due',
+                                                                                            'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.SeqDo': ( 'transforms.html#seqdo',
                                                                                       'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.SeqDo.__call__': ( 'transforms.html#seqdo.__call__',
@@ -124,16 +638,34 @@ d = { 'settings': { 'branch': 'main',
                                                                                                   'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.Streamable.stream': ( 'transforms.html#streamable.stream',
                                                                                                   'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Throttle': ( 'transforms.html#throttle',
+                                                                                         'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Throttle.__init__': ( 'transforms.html#throttle.__init__',
+                                                                                                  'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms.Throttle._due': ( 'transforms.html#throttle._due',
+                                                                                              'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.Transform': ( 'transforms.html#transform',
                                                                                           'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.Transform.__call__': ( 'transforms.html#transform.__call__',
                                                                                                    'fastagent_hacking/transforms.py'),
-                                              'fastagent_hacking.transforms.Transform.__or__': ( 'transforms.html#transform.__or__',
-                                                                                                 'fastagent_hacking/transforms.py'),
-                                              'fastagent_hacking.transforms.Transform.__ror__': ( 'transforms.html#transform.__ror__',
-                                                                                                  'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._Coalesce': ( 'transforms.html#_coalesce',
+                                                                                          'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._Coalesce.__call__': ( 'transforms.html#_coalesce.__call__',
+                                                                                                   'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._Coalesce.__init__': ( 'transforms.html#_coalesce.__init__',
+                                                                                                   'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._Coalesce._due': ( 'transforms.html#_coalesce._due',
+                                                                                               'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms._print_task_errors': ( 'transforms.html#_print_task_errors',
                                                                                                    'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._stage_name': ( 'transforms.html#_stage_name',
+                                                                                            'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._traced': ( 'transforms.html#_traced',
+                                                                                        'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._transform_or': ( 'transforms.html#_transform_or',
+                                                                                              'fastagent_hacking/transforms.py'),
+                                              'fastagent_hacking.transforms._transform_ror': ( 'transforms.html#_transform_ror',
+                                                                                               'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.as_transform': ( 'transforms.html#as_transform',
                                                                                              'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.cur_sink': ( 'transforms.html#cur_sink',
@@ -141,4 +673,42 @@ d = { 'settings': { 'branch': 'main',
                                               'fastagent_hacking.transforms.tfn': ( 'transforms.html#tfn',
                                                                                     'fastagent_hacking/transforms.py'),
                                               'fastagent_hacking.transforms.use_sink': ( 'transforms.html#use_sink',
-                                                                                         'fastagent_hacking/transforms.py')}}}
+                                                                                         'fastagent_hacking/transforms.py')},
+            'fastagent_hacking.transport': { 'fastagent_hacking.transport.RemoteTransform': ( 'transport.html#remotetransform',
+                                                                                              'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.RemoteTransform.__call__': ( 'transport.html#remotetransform.__call__',
+                                                                                                       'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.RemoteTransform.__init__': ( 'transport.html#remotetransform.__init__',
+                                                                                                       'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.SocketChannelWriter': ( 'transport.html#socketchannelwriter',
+                                                                                                  'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.SocketChannelWriter.__init__': ( 'transport.html#socketchannelwriter.__init__',
+                                                                                                           'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.SocketChannelWriter._maybe_close': ( 'transport.html#socketchannelwriter._maybe_close',
+                                                                                                               'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.SocketChannelWriter.put': ( 'transport.html#socketchannelwriter.put',
+                                                                                                      'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.SocketChannelWriter.readonly': ( 'transport.html#socketchannelwriter.readonly',
+                                                                                                           'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.SocketChannelWriter.shutdown': ( 'transport.html#socketchannelwriter.shutdown',
+                                                                                                           'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport._check_size': ( 'transport.html#_check_size',
+                                                                                          'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport._decode_frame': ( 'transport.html#_decode_frame',
+                                                                                            'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport._decode_payload': ( 'transport.html#_decode_payload',
+                                                                                              'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport._encode_payload': ( 'transport.html#_encode_payload',
+                                                                                              'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport._read_packets': ( 'transport.html#_read_packets',
+                                                                                            'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.connect': ( 'transport.html#connect',
+                                                                                      'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.decode_packet': ( 'transport.html#decode_packet',
+                                                                                            'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.encode_packet': ( 'transport.html#encode_packet',
+                                                                                            'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.serve': ( 'transport.html#serve',
+                                                                                    'fastagent_hacking/transport.py'),
+                                             'fastagent_hacking.transport.serve_transform': ( 'transport.html#serve_transform',
+                                                                                              'fastagent_hacking/transport.py')}}}
@@ -0,0 +1,167 @@
+"""Load generation and performance reports for chat pipelines."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/08_bench.ipynb.
+
+# %% auto 0
+__all__ = ['percentile', 'BenchReport', 'bench_chat']
+
+# %% ../nbs/08_bench.ipynb 3
+import asyncio
+import dataclasses
+import math
+import time
+import tracemalloc
+from typing import Sequence
+
+import fastagent_hacking.streams as sx
+import fastagent_hacking.channels as cx
+import fastagent_hacking.llms as lx
+
+# %% ../nbs/08_bench.ipynb 8
+def percentile(xs: Sequence[float], q: float) -> float:
+    """Returns the `q`-th percentile (0 <= q <= 100) of `xs` using the nearest rank."""
+    if not xs:
+        return math.nan
+    xs = sorted(xs)
+    rank = max(math.ceil(q / 100 * len(xs)), 1)
+    return xs[rank - 1]
+
+# %% ../nbs/08_bench.ipynb 10
+class _LoopLagProbe:
+    """Measures how late the event loop wakes up a task that sleeps `interval_s`.
+
+    A blocked event loop delays every task, so the lag is a proxy for the time
+    spent in blocking calls.
+    """
+
+    def __init__(self, interval_s: float = 0.005):
+        self._interval_s = interval_s
+        self.lags = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self._interval_s)
+            self.lags.append(max(0.0, time.perf_counter() - start - self._interval_s))
+
+# %% ../nbs/08_bench.ipynb 12
+@dataclasses.dataclass(frozen=True)
+class BenchReport:
+    """The results of a benchmark run.
+
+    Attributes:
+      pipelines: The number of concurrent pipelines.
+      turns: The total number of completed chat turns.
+      duration_s: The wall time of the run.
+      tokens: The total number of streamed chunks. Each chunk is counted as one token.
+      tokens_per_s: The throughput of the run.
+      ttfc_p50_s: The median time to the first chunk of a turn.
+      ttfc_p99_s: The 99th percentile of the time to the first chunk of a turn.
+      loop_lag_p99_s: The 99th percentile of the event loop lag.
+      loop_lag_max_s: The maximum event loop lag.
+      peak_mem_bytes: The peak memory allocated during the run, if traced.
+    """
+
+    pipelines: int
+    turns: int
+    duration_s: float
+    tokens: int
+    tokens_per_s: float
+    ttfc_p50_s: float
+    ttfc_p99_s: float
+    loop_lag_p99_s: float
+    loop_lag_max_s: float
+    peak_mem_bytes: int | None
+
+# %% ../nbs/08_bench.ipynb 13
+async def _run_pipeline(
+    backend: lx.Backend,
+    prompts: Sequence[lx.MsgLike],
+    ttfcs: list[float],
+) -> int:
+    """Sends the prompts one turn at a time to a `Chat` and returns the number of chunks."""
+    w = cx.as_chan_writer(sx.InMemStreamWriter())
+    out = lx.Chat(backend)(w.readonly())
+
+    tokens = 0
+    for prompt in prompts:
+        start = time.perf_counter()
+        await w.put(cx.Packet(payload=prompt, packet_type=cx.PacketType.DATA))
+        first = True
+        async for p in out:
+            if p.packet_type != cx.PacketType.DATA:
+                continue
+            if first:
+                ttfcs.append(time.perf_counter() - start)
+                first = False
+            tokens += 1
+            if p.payload.end:
+                break
+
+    await w.shutdown()
+    async for _ in out:
+        pass  # Let the pipeline wind down.
+    return tokens
+
+
+async def bench_chat(
+    backend: lx.Backend,
+    *,
+    pipelines: int = 10,
+    prompts: Sequence[lx.MsgLike] = ("Hello!",),
+    trace_memory: bool = False,
+) -> BenchReport:
+    """Drives `pipelines` concurrent `Chat` pipelines and reports their performance.
+
+    Each pipeline sends the `prompts` one turn at a time, waiting for the end of
+    the previous answer.
+
+    Args:
+      backend: The backend of the chats. Use a `FakeBackend` for reproducible runs.
+      pipelines: The number of concurrent pipelines.
+      prompts: The prompts of the successive turns of each pipeline.
+      trace_memory: If True, reports the peak memory allocated during the run.
+        Tracing memory slows the run down.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    probe = _LoopLagProbe()
+    probe.start()
+    ttfcs = []
+
+    start = time.perf_counter()
+    try:
+        tokens = await asyncio.gather(
+            *[_run_pipeline(backend, prompts, ttfcs) for _ in range(pipelines)]
+        )
+    finally:
+        duration = time.perf_counter() - start
+        await probe.stop()
+        peak_mem = None
+        if trace_memory:
+            _, peak_mem = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    return BenchReport(
+        pipelines=pipelines,
+        turns=len(ttfcs),
+        duration_s=duration,
+        tokens=sum(tokens),
+        tokens_per_s=sum(tokens) / duration,
+        ttfc_p50_s=percentile(ttfcs, 50),
+        ttfc_p99_s=percentile(ttfcs, 99),
+        loop_lag_p99_s=percentile(probe.lags, 99),
+        loop_lag_max_s=max(probe.lags, default=0.0),
+        peak_mem_bytes=peak_mem,
+    )
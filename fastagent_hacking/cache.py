@@ -0,0 +1,366 @@
+"""Response caching for LLM backends."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_cache.ipynb.
+
+# %% auto 0
+__all__ = ['CacheEntry', 'ResponseCache', 'LRUCache', 'SqliteCache', 'CachedBackend']
+
+# %% ../nbs/04_cache.ipynb 3
+import abc
+import asyncio
+import collections
+import dataclasses
+import functools
+import hashlib
+import json
+import sqlite3
+from typing import Sequence
+
+import fastagent_hacking.streams as sx
+import fastagent_hacking.transforms as tx
+import fastagent_hacking.llms as lx
+
+# %% ../nbs/04_cache.ipynb 8
+@dataclasses.dataclass(frozen=True)
+class CacheEntry:
+    """A cached chat response.
+
+    Attributes:
+      msg: The final message returned by `Backend.chat`.
+      chunks: The chunks that were streamed to the sink while generating `msg`.
+        They are replayed on a cache hit so streaming consumers see the same output.
+    """
+
+    msg: lx.Msg
+    chunks: Sequence[lx.MsgChunk] = ()
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "msg": self.msg.to_json(),
+                "chunks": [c.to_json() for c in self.chunks],
+            }
+        )
+
+    @classmethod
+    def from_json(cls, json_str: str) -> "CacheEntry":
+        d = json.loads(json_str)
+        return cls(
+            msg=lx.Msg.from_json(d["msg"]),
+            chunks=tuple(lx.MsgChunk.from_json(c) for c in d["chunks"]),
+        )
+
+# %% ../nbs/04_cache.ipynb 11
+def _update(h, tag: bytes, data: bytes):
+    # Length-prefix every field so that distinct inputs can't collide.
+    h.update(tag)
+    h.update(len(data).to_bytes(8, "little"))
+    h.update(data)
+
+
+def _hash_content(h, content: lx.MsgContent):
+    if isinstance(content, str):
+        _update(h, b"s", content.encode())
+    elif isinstance(content, bytes):
+        _update(h, b"b", content)
+    elif lx._is_image(content):
+        _update(h, b"i", f"{content.mode}:{content.size}".encode())
+        h.update(content.tobytes())
+    elif lx._is_encoded_image(content):
+        # Hashed in its encoded form, so it isn't decoded.
+        _update(h, b"e", content.data)
+    elif isinstance(content, (list, tuple)):
+        _update(h, b"l", str(len(content)).encode())
+        for c in content:
+            _hash_content(h, c)
+    else:
+        raise ValueError(f"Cannot hash {content} with type {type(content)}")
+
+
+def _msg_digest(msg: lx.MsgLike) -> bytes:
+    """Returns a stable digest of the parts of `msg` that affect the LLM output."""
+    if not isinstance(msg, lx.Msg):
+        msg = lx.Msg(role="user", content=msg)
+
+    h = hashlib.sha256()
+    _update(h, b"r", msg.role.encode())
+    _hash_content(h, msg.content)
+    return h.digest()
+
+
+class _Keyer:
+    """Computes cache keys for chat requests.
+
+    A chat history is resent in full on every turn, so the digests of individual
+    messages are memoised: a growing conversation only hashes its new messages.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self._maxsize = maxsize
+        # Maps id(msg) -> (msg, digest). Holding `msg` keeps its id from being reused.
+        self._digests = collections.OrderedDict()
+
+    def __call__(self, msgs: Sequence[lx.MsgLike], **params) -> str:
+        h = hashlib.sha256()
+        _update(h, b"p", json.dumps(params, sort_keys=True).encode())
+        for msg in msgs:
+            h.update(self._digest(msg))
+        return h.hexdigest()
+
+    def _digest(self, msg: lx.MsgLike) -> bytes:
+        if (e := self._digests.get(id(msg))) and e[0] is msg:
+            self._digests.move_to_end(id(msg))
+            return e[1]
+
+        digest = _msg_digest(msg)
+        self._digests[id(msg)] = (msg, digest)
+        if len(self._digests) > self._maxsize:
+            self._digests.popitem(last=False)
+        return digest
+
+# %% ../nbs/04_cache.ipynb 14
+class ResponseCache(abc.ABC):
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> CacheEntry | None:
+        """Returns the entry associated with `key` or None if missing."""
+
+    @abc.abstractmethod
+    async def put(self, key: str, entry: CacheEntry):
+        """Associates `entry` with `key`."""
+
+# %% ../nbs/04_cache.ipynb 15
+class LRUCache(ResponseCache):
+    """In-memory cache that evicts the least recently used entries."""
+
+    def __init__(self, maxsize: int = 1024):
+        assert maxsize > 0, f"Expected a positive maxsize, got {maxsize}"
+        self._maxsize = maxsize
+        self._entries = collections.OrderedDict()
+
+    async def get(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def put(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# %% ../nbs/04_cache.ipynb 17
+class SqliteCache(ResponseCache):
+    """On-disk cache backed by a sqlite database.
+
+    The queries run in a thread, off the event loop.
+    """
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, entry TEXT)"
+        )
+        self._db.commit()
+        # Serializes the queries, as the connection is shared by the threads.
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> CacheEntry | None:
+        async with self._lock:
+            row = await asyncio.to_thread(self._get, key)
+        return CacheEntry.from_json(row[0]) if row else None
+
+    async def put(self, key: str, entry: CacheEntry):
+        data = entry.to_json()
+        async with self._lock:
+            await asyncio.to_thread(self._put, key, data)
+
+    def _get(self, key: str) -> tuple[str] | None:
+        return self._db.execute(
+            "SELECT entry FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _put(self, key: str, data: str):
+        self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?)", (key, data))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+# %% ../nbs/04_cache.ipynb 21
+class _Flight(sx.Sink[lx.MsgChunk]):
+    """An upstream chat call whose chunks can be followed by many callers.
+
+    The upstream call runs in its own task so that cancelling one caller doesn't
+    cancel the others. It's only cancelled once every caller has stopped following it.
+    """
+
+    def __init__(self, call):
+        self._chunks = []
+        self._done = False
+        self._followers = 0
+        self._abandoned = False
+        self._cond = asyncio.Condition()
+        self._task = asyncio.create_task(self._run(call))
+
+    async def _run(self, call) -> lx.Msg:
+        try:
+            return await call(sink=self)
+        finally:
+            self._done = True
+            async with self._cond:
+                self._cond.notify_all()
+
+    async def put(self, *items: lx.MsgChunk):
+        self._chunks.extend(items)
+        async with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def chunks(self) -> Sequence[lx.MsgChunk]:
+        return tuple(self._chunks)
+
+    @property
+    def abandoned(self) -> bool:
+        """Whether the call is cancelled because no caller follows it anymore."""
+        return self._abandoned
+
+    async def follow(self, sink: sx.Sink | None) -> lx.Msg:
+        """Forwards the chunks to `sink` as they arrive and returns the final message."""
+        self._followers += 1
+        try:
+            i = 0
+            while True:
+                async with self._cond:
+                    await self._cond.wait_for(
+                        lambda: i < len(self._chunks) or self._done
+                    )
+                while i < len(self._chunks):
+                    if sink:
+                        await sink.put(self._chunks[i])
+                    i += 1
+                if self._done:
+                    return await self._task
+        finally:
+            self._followers -= 1
+            if not self._followers and not self._task.done():
+                self._abandoned = True
+                self._task.cancel()
+
+# %% ../nbs/04_cache.ipynb 22
+class CachedBackend(lx.Backend):
+    """Backend decorator that caches chat responses.
+
+    Requests are keyed on the messages, the model and the sampling parameters.
+    On a cache hit, the recorded chunks are replayed through the sink so that
+    `chat.stream` consumers can't tell a hit from a miss.
+
+    Args:
+      backend: The backend to cache the responses of.
+      caches: The cache tiers, looked up in order. A hit in a lower tier is
+        promoted to the tiers above it. Defaults to a single in-memory `LRUCache`.
+      model: The model name used in the cache keys. Defaults to `backend.model`
+        if it exists.
+      coalesce: If True, concurrent identical requests share one upstream call.
+    """
+
+    def __init__(
+        self,
+        backend: lx.Backend,
+        *,
+        caches: Sequence[ResponseCache] | None = None,
+        model: str | None = None,
+        coalesce: bool = True,
+    ):
+        self._backend = backend
+        self._caches = list(caches) if caches is not None else [LRUCache()]
+        self._model = model if model is not None else getattr(backend, "model", "")
+        self._coalesce = coalesce
+        self._keyer = _Keyer()
+        self._flights = {}
+
+    @tx.tfn
+    async def chat(
+        self,
+        msgs: Sequence[lx.MsgLike],
+        *,
+        name: str = "",
+        temperature: float | None = None,
+        sink=None,
+    ) -> lx.Msg:
+        key = self._keyer(msgs, model=self._model, temperature=temperature)
+
+        if entry := await self._lookup(key):
+            for chunk in entry.chunks:
+                if sink:
+                    await sink.put(dataclasses.replace(chunk, name=name))
+            return dataclasses.replace(entry.msg, name=name)
+
+        flight = self._flights.get(key) if self._coalesce else None
+        # An abandoned flight is being cancelled, and can't be joined anymore.
+        if not flight or flight.abandoned:
+            flight = _Flight(
+                functools.partial(
+                    self._fetch,
+                    key,
+                    msgs,
+                    name=name,
+                    temperature=temperature,
+                )
+            )
+            if self._coalesce:
+                self._flights[key] = flight
+
+        msg = await flight.follow(_Renamer(sink, name) if sink else None)
+        return dataclasses.replace(msg, name=name)
+
+    async def _lookup(self, key: str) -> CacheEntry | None:
+        for i, cache in enumerate(self._caches):
+            if entry := await cache.get(key):
+                for c in self._caches[:i]:
+                    await c.put(key, entry)
+                return entry
+        return None
+
+    async def _fetch(
+        self,
+        key: str,
+        msgs: Sequence[lx.MsgLike],
+        *,
+        name: str,
+        temperature: float | None,
+        sink: _Flight,
+    ) -> lx.Msg:
+        try:
+            msg = await self._backend.chat(
+                msgs,
+                name=name,
+                temperature=temperature,
+                sink=sink,
+            )
+        finally:
+            # The flight may have been replaced after being abandoned.
+            if self._coalesce and self._flights.get(key) is sink:
+                del self._flights[key]
+
+        entry = CacheEntry(msg=msg, chunks=sink.chunks)
+        for cache in self._caches:
+            await cache.put(key, entry)
+        return msg
+
+
+class _Renamer(sx.Sink[lx.MsgChunk]):
+    """Forwards chunks to `sink` under the caller's assistant name."""
+
+    def __init__(self, sink: sx.Sink, name: str):
+        self._sink, self._name = sink, name
+
+    async def put(self, *items: lx.MsgChunk):
+        await self._sink.put(*(dataclasses.replace(c, name=self._name) for c in items))
+
+    async def shutdown(self):
+        await self._sink.shutdown()
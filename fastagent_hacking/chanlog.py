@@ -0,0 +1,317 @@
+"""Durable and replayable channels."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/14_chanlog.ipynb.
+
+# %% auto 0
+__all__ = ['LogChannelWriter']
+
+# %% ../nbs/14_chanlog.ipynb 3
+import array
+import asyncio
+import bisect
+import json
+import mmap
+import os
+import struct
+import time
+from typing import AsyncIterator
+
+import fastagent_hacking.streams as sx
+import fastagent_hacking.channels as cx
+import fastagent_hacking.transport as tp
+
+# %% ../nbs/14_chanlog.ipynb 8
+_FRAME_SIZE = struct.Struct("<I")
+
+# The packets read between two yields to the event loop when replaying.
+_READ_BATCH = 256
+
+# The unmapped bytes at the end of a segment before it is remapped.
+_MAP_CHUNK = 1 << 20
+
+
+class _Segment:
+    """A segment file of the log, and the positions of its packets."""
+
+    def __init__(self, path: str, base: int):
+        self.path = path
+        self.base = base
+        self.positions = array.array("Q")
+        self.size = 0
+        self._file = None
+        self._mmap = None
+
+    def scan(self):
+        """Indexes the packets of the file, and drops a partial write at its end."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            pos = 0
+            while pos + _FRAME_SIZE.size <= len(data):
+                [size] = _FRAME_SIZE.unpack_from(data, pos)
+                if pos + _FRAME_SIZE.size + size > len(data):
+                    break
+                self.positions.append(pos)
+                pos += _FRAME_SIZE.size + size
+            if pos < len(data):
+                # Only truncates when needed, as it also resets the age used by the retention.
+                f.truncate(pos)
+        self.size = pos
+
+    def append(self, frame_size: int):
+        self.positions.append(self.size)
+        self.size += frame_size
+
+    def read(self, i: int) -> cx.Packet:
+        start = self.positions[i]
+        end = self.positions[i + 1] if i + 1 < len(self.positions) else self.size
+        if self._file is None:
+            self._file = open(self.path, "rb", buffering=0)
+        mapped = len(self._mmap) if self._mmap else 0
+        if end > mapped and (mapped == 0 or self.size - mapped >= _MAP_CHUNK):
+            if self._mmap:
+                self._mmap.close()
+            self._mmap = mmap.mmap(
+                self._file.fileno(), self.size, access=mmap.ACCESS_READ
+            )
+            mapped = self.size
+        if end <= mapped:
+            return tp.decode_packet(self._mmap[start:end])
+        # The segment grew since it was mapped.
+        self._file.seek(start)
+        return tp.decode_packet(self._file.read(end - start))
+
+    def close(self):
+        """Releases the file. The packets of the segment can't be read anymore."""
+        self.positions = array.array("Q")
+        if self._mmap:
+            self._mmap.close()
+            self._mmap = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+# %% ../nbs/14_chanlog.ipynb 9
+class LogChannelWriter(cx.ChannelWriter):
+    """A channel writer persisting its packets in an append-only log.
+
+    Each packet gets an offset, its position in the log. Readers can start
+    from any offset, and consumers commit the offset they processed up to, so a
+    restarted pipeline resumes where it stopped.
+
+    Args:
+      path: The directory of the log. Reopening a log appends to it.
+      segment_bytes: The size above which a new segment is started.
+      sync_interval_s: The max delay before the written packets are synced to disk.
+      retention_bytes: Optional. The segments are deleted, oldest first, while
+        the log is larger.
+      retention_s: Optional. The segments not written for this long are deleted.
+
+    The retention is applied when the log is opened, synced, and when a new segment is started.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        segment_bytes: int = 64 << 20,
+        sync_interval_s: float = 0.05,
+        retention_bytes: int | None = None,
+        retention_s: float | None = None,
+    ):
+        self._path = path
+        self._segment_bytes = segment_bytes
+        self._sync_interval_s = sync_interval_s
+        self._retention_bytes = retention_bytes
+        self._retention_s = retention_s
+        os.makedirs(path, exist_ok=True)
+
+        self._segments = []
+        for fname in sorted(f for f in os.listdir(path) if f.endswith(".log")):
+            seg = _Segment(os.path.join(path, fname), int(fname.removesuffix(".log")))
+            seg.scan()
+            self._segments.append(seg)
+        if not self._segments:
+            self._segments.append(self._new_segment(0))
+        self._end = self._segments[-1].base + len(self._segments[-1].positions)
+        self._file = open(self._segments[-1].path, "ab")
+        self._synced = self._end
+        self._apply_retention()
+
+        self._offsets_path = os.path.join(path, "offsets.json")
+        self._offsets = {}
+        if os.path.exists(self._offsets_path):
+            with open(self._offsets_path) as f:
+                self._offsets = json.load(f)
+
+        # Serializes the file operations.
+        self._lock = asyncio.Lock()
+        self._sync_task = None
+        # Set, and replaced, when packets are written.
+        self._written = asyncio.Event()
+        self._closed = False
+
+    @property
+    def end_offset(self) -> int:
+        """The offset of the next packet written."""
+        return self._end
+
+    @property
+    def synced_offset(self) -> int:
+        """The packets before this offset are on disk."""
+        return self._synced
+
+    async def put(self, *packets: cx.Packet):
+        assert all(isinstance(p, cx.Packet) for p in packets)
+        assert not self._closed, "The log is shut down"
+        frames = [tp.encode_packet(p) for p in packets]
+        async with self._lock:
+            seg = self._segments[-1]
+            self._file.write(b"".join(frames))
+            self._file.flush()
+            for frame in frames:
+                seg.append(len(frame))
+            self._end += len(frames)
+            if seg.size >= self._segment_bytes:
+                await self._roll()
+
+        self._written.set()
+        self._written = asyncio.Event()
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_later())
+
+    async def sync(self):
+        """Syncs the written packets to disk."""
+        async with self._lock:
+            if self._file.closed:
+                return
+            end = self._end
+            await asyncio.to_thread(os.fsync, self._file.fileno())
+            self._synced = end
+            self._apply_retention()
+
+    async def shutdown(self):
+        """Syncs the log and ends the channels following it."""
+        if self._closed:
+            return
+        if self._sync_task:
+            self._sync_task.cancel()
+        await self.sync()
+        self._closed = True
+        self._file.close()
+        self._written.set()
+
+    def committed(self, consumer: str) -> int:
+        """Returns the offset `consumer` processed up to, 0 if none."""
+        return self._offsets.get(consumer, 0)
+
+    async def commit(self, consumer: str, offset: int):
+        """Records that `consumer` processed the packets before `offset`."""
+        self._offsets[consumer] = offset
+        data = json.dumps(self._offsets)
+
+        def write():
+            # Replace the file atomically so that a crash can't corrupt it.
+            tmp = f"{self._offsets_path}.tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._offsets_path)
+
+        async with self._lock:
+            await asyncio.to_thread(write)
+
+    async def read(
+        self, offset: int = 0, *, follow: bool = True
+    ) -> AsyncIterator[tuple[int, cx.Packet]]:
+        """Yields the packets from `offset` with their offsets.
+
+        Args:
+          offset: The offset of the first packet. The packets deleted by the
+            retention are skipped.
+          follow: If True, waits for the new packets until the writer is shut down.
+            Otherwise, stops at the end of the log.
+        """
+        n = 0
+        while True:
+            written = self._written
+            while offset < self._end:
+                segs = self._segments
+                i = bisect.bisect_right(segs, offset, key=lambda s: s.base) - 1
+                if i < 0:
+                    offset = segs[0].base
+                    continue
+                seg = segs[i]
+                while offset < seg.base + len(seg.positions):
+                    yield offset, seg.read(offset - seg.base)
+                    offset += 1
+                    n += 1
+                    if n % _READ_BATCH == 0:
+                        await asyncio.sleep(0)
+            if not follow or self._closed:
+                return
+            await written.wait()
+
+    def readonly(
+        self,
+        *,
+        offset: int | None = None,
+        consumer: str | None = None,
+        follow: bool = True,
+    ) -> cx.Channel:
+        """Returns a channel of the packets of the log.
+
+        Args:
+          offset: The offset of the first packet. Defaults to the offset
+            committed by `consumer`, or to the start of the log.
+          consumer: Optional. The name of the consumer, see `commit`.
+          follow: See `read`.
+        """
+        if offset is None:
+            offset = self.committed(consumer) if consumer else 0
+
+        async def packets():
+            async for _, p in self.read(offset, follow=follow):
+                yield p
+
+        return cx.as_chan(sx.of(packets()), name=consumer or "log")
+
+    def _new_segment(self, base: int) -> _Segment:
+        seg = _Segment(os.path.join(self._path, f"{base:020d}.log"), base)
+        open(seg.path, "ab").close()
+        return seg
+
+    async def _roll(self):
+        await asyncio.to_thread(os.fsync, self._file.fileno())
+        self._synced = self._end
+        self._file.close()
+        self._segments.append(self._new_segment(self._end))
+        self._file = open(self._segments[-1].path, "ab")
+        self._apply_retention()
+
+    def _apply_retention(self):
+        total = sum(s.size for s in self._segments)
+        now = time.time()
+        # The active segment is always kept.
+        while len(self._segments) > 1:
+            seg = self._segments[0]
+            too_big = (
+                self._retention_bytes is not None and total > self._retention_bytes
+            )
+            too_old = (
+                self._retention_s is not None
+                and now - os.path.getmtime(seg.path) > self._retention_s
+            )
+            if not (too_big or too_old):
+                break
+            total -= seg.size
+            # The readers still in the segment move on to the next one.
+            seg.close()
+            os.remove(seg.path)
+            self._segments.pop(0)
+
+    async def _sync_later(self):
+        await asyncio.sleep(self._sync_interval_s)
+        self._sync_task = None
+        if not self._closed:
+            await self.sync()
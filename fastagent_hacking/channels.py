@@ -3,18 +3,26 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/01_channels.ipynb.
 
 # %% auto 0
-__all__ = ['PacketType', 'Packet', 'mk_cancellation_packet', 'Channel', 'as_chan', 'ChannelWriter', 'as_chan_writer']
+__all__ = ['PacketType', 'Packet', 'mk_cancellation_packet', 'DedupIndex', 'ExactIndex', 'BloomIndex', 'dedup_key', 'Channel',
+           'as_chan', 'ChannelWriter', 'as_chan_writer']
 
 # %% ../nbs/01_channels.ipynb 3
 import abc
 import asyncio
+import bisect
+import collections
+import dataclasses
 import enum
+import hashlib
 import json
+import math
+import sys
 import time
 import uuid
 from dataclasses import dataclass, field
-from typing import Any, Generic, TypeVar, Sequence
+from typing import Any, Callable, Generic, Hashable, Literal, TypeVar, Sequence
 
+import fastagent_hacking.metrics as mx
 import fastagent_hacking.streams as sx
 
 # %% ../nbs/01_channels.ipynb 7
@@ -97,23 +105,274 @@ def mk_cancellation_packet(*, tag: str) -> Packet:
     )
 
 # %% ../nbs/01_channels.ipynb 17
+class _Buckets:
+    """Packets in one FIFO per priority, read from the highest priority."""
+
+    def __init__(self):
+        self._levels = {}
+        # The priorities with packets, in increasing order.
+        self._active = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        for priority in reversed(self._active):
+            yield from self._levels[priority]
+
+    def append(self, p: Packet):
+        q = self._levels.get(p.priority)
+        if q is None:
+            q = self._levels[p.priority] = collections.deque()
+        if not q:
+            bisect.insort(self._active, p.priority)
+        q.append(p)
+        self._len += 1
+
+    def popleft(self) -> Packet:
+        q = self._levels[self._active[-1]]
+        p = q.popleft()
+        if not q:
+            self._active.pop()
+        self._len -= 1
+        return p
+
+
+class _PacketQueue(asyncio.Queue):
+    """An `asyncio.Queue` of packets, read by decreasing priority."""
+
+    def _init(self, maxsize):
+        self._queue = _Buckets()
+
+# %% ../nbs/01_channels.ipynb 22
+def _write_key(key: Any, h: "hashlib._Hash"):
+    """Feeds a canonical serialization of `key` to the hash `h`."""
+    if key is None or isinstance(key, (bool, int, float)):
+        h.update(b"n" + json.dumps(key).encode())
+    elif isinstance(key, (str, bytes)):
+        data = key.encode() if isinstance(key, str) else key
+        h.update(b"s" if isinstance(key, str) else b"b")
+        h.update(len(data).to_bytes(8, "little") + data)
+    elif isinstance(key, (list, tuple)):
+        h.update(b"l" + len(key).to_bytes(8, "little"))
+        for x in key:
+            _write_key(x, h)
+    elif isinstance(key, dict):
+        # The digests of the items don't depend on their order.
+        items = sorted(_digest(item) for item in key.items())
+        h.update(b"d" + len(items).to_bytes(8, "little") + b"".join(items))
+    elif all(hasattr(key, a) for a in ("dtype", "shape", "tobytes")):
+        _write_key((str(key.dtype), tuple(key.shape)), h)
+        _write_key(key.tobytes(), h)
+    elif dataclasses.is_dataclass(key) and not isinstance(key, type):
+        _write_key(type(key).__qualname__, h)
+        _write_key([getattr(key, f.name) for f in dataclasses.fields(key)], h)
+    else:
+        raise ValueError(
+            f"Cannot derive a dedup key from {type(key)}, use a key function instead."
+        )
+
+
+def _digest(key: Hashable) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    _write_key(key, h)
+    return h.digest()
+
+
+class DedupIndex(abc.ABC):
+    """Records the keys seen, to detect the duplicates."""
+
+    @abc.abstractmethod
+    def add(self, key: Hashable) -> bool:
+        """Records `key`. Returns False if it was already recorded, i.e. a duplicate."""
+
+    @abc.abstractmethod
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether `key` is recorded."""
+
+    @property
+    @abc.abstractmethod
+    def nbytes(self) -> int:
+        """The approximate memory used by the index."""
+
+    @property
+    def fp_rate(self) -> float:
+        """The estimated probability that a new key is reported as a duplicate."""
+        return 0.0
+
+
+class ExactIndex(DedupIndex):
+    """Records the digests of the last keys.
+
+    Args:
+      window_s: Optional. How long the keys are recorded.
+      max_size: The max number of keys recorded. The oldest are dropped first.
+    """
+
+    def __init__(self, *, window_s: float | None = None, max_size: int = 100_000):
+        self._window_s = window_s
+        self._max_size = max_size
+        # The time each key was first seen, in insertion order.
+        self._seen: collections.OrderedDict[bytes, float] = collections.OrderedDict()
+
+    def add(self, key: Hashable) -> bool:
+        now = time.monotonic()
+        self._expire(now)
+        d = _digest(key)
+        if d in self._seen:
+            return False
+        self._seen[d] = now
+        if len(self._seen) > self._max_size:
+            self._seen.popitem(last=False)
+        return True
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._expire(time.monotonic())
+        return _digest(key) in self._seen
+
+    def __len__(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._seen)
+
+    @property
+    def nbytes(self) -> int:
+        entry = sys.getsizeof(bytes(16)) + sys.getsizeof(0.0)
+        return sys.getsizeof(self._seen) + len(self._seen) * entry
+
+    def _expire(self, now: float):
+        if self._window_s is None:
+            return
+        while self._seen and next(iter(self._seen.values())) < now - self._window_s:
+            self._seen.popitem(last=False)
+
+
+class BloomIndex(DedupIndex):
+    """Records the keys in two generations of Bloom filters.
+
+    The keys are added to the current generation, and looked up in both. The current
+    generation becomes the previous one after `capacity` keys or `window_s`, so a key
+    is recorded for at least `capacity` keys and `window_s`.
+
+    Args:
+      capacity: The number of keys per generation.
+      fp_rate: The target false positive rate of each generation.
+      window_s: Optional. The max duration of a generation.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = 1_000_000,
+        fp_rate: float = 0.001,
+        window_s: float | None = None,
+    ):
+        self._capacity = capacity
+        self._window_s = window_s
+        self._m = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        self._k = max(1, round(self._m / capacity * math.log(2)))
+        self._cur = self._new_gen()
+        self._prev = self._new_gen()
+
+    def add(self, key: Hashable) -> bool:
+        self._rotate()
+        positions = self._positions(key)
+        if self._has(self._cur, positions) or self._has(self._prev, positions):
+            return False
+        bits = self._cur["bits"]
+        for i in positions:
+            if not bits[i >> 3] & (1 << (i & 7)):
+                bits[i >> 3] |= 1 << (i & 7)
+                self._cur["set"] += 1
+        self._cur["n"] += 1
+        return True
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._rotate()
+        positions = self._positions(key)
+        return self._has(self._cur, positions) or self._has(self._prev, positions)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._cur["bits"]) + len(self._prev["bits"])
+
+    @property
+    def fp_rate(self) -> float:
+        # A new key is a false positive when all its bits are set in either generation.
+        cur, prev = ((g["set"] / self._m) ** self._k for g in (self._cur, self._prev))
+        return 1 - (1 - cur) * (1 - prev)
+
+    def _new_gen(self) -> dict:
+        return {
+            "bits": bytearray((self._m + 7) // 8),
+            "set": 0,
+            "n": 0,
+            "started_at": time.monotonic(),
+        }
+
+    def _rotate(self):
+        full = self._cur["n"] >= self._capacity
+        if (
+            full
+            or self._window_s is not None
+            and time.monotonic() - self._cur["started_at"] > self._window_s
+        ):
+            self._prev, self._cur = self._cur, self._new_gen()
+
+    def _positions(self, key: Hashable) -> list[int]:
+        # Double hashing: the k positions are derived from two hashes.
+        d = _digest(key)
+        h1, h2 = int.from_bytes(d[:8]), int.from_bytes(d[8:]) | 1
+        return [(h1 + i * h2) % self._m for i in range(self._k)]
+
+    def _has(self, gen: dict, positions: list[int]) -> bool:
+        bits = gen["bits"]
+        return all(bits[i >> 3] & (1 << (i & 7)) for i in positions)
+
+
+def dedup_key(p: Packet, by: Literal["id", "payload"]) -> Hashable:
+    """The key identifying the duplicates of a packet.
+
+    Args:
+      p: The packet.
+      by: "id" for the duplicates of the packet itself, or "payload" for the packets
+        with the same payload derived from the same packet, e.g. by a retried stage.
+    """
+    if by == "id":
+        return p.packet_id
+    if by == "payload":
+        return (p.parent_packet_id, p.payload)
+    raise ValueError(f"Unknown dedup key: {by}")
+
+# %% ../nbs/01_channels.ipynb 28
 class Channel(sx.Stream[Packet[Any]], Generic[_T]):
     pass
 
 
-def as_chan(s: sx.Stream[Packet[Any]]) -> Channel[_T]:
-    """Coerce a stream of packets to a channel. Do not use `s` after this function."""
+def as_chan(
+    s: sx.Stream[Packet[Any]],
+    *,
+    name: str = "chan",
+    dedup: DedupIndex | None = None,
+) -> Channel[_T]:
+    """Coerce a stream of packets to a channel. Do not use `s` after this function.
+
+    Args:
+      s: The stream of packets.
+      name: The name of the channel in the metrics. See `metrics`.
+      dedup: Optional. Drops the DATA packets whose id is already in the index.
+        See `transforms.Dedup` for other keys.
+    """
 
     class _ChanStream(Channel[_T]):
 
         def __init__(self):
             super().__init__()
-            self._pq = asyncio.PriorityQueue()
+            self._pq = _PacketQueue()
             self._bad_tags = set()  # FIXME: This can grow indefinitely.
 
-            asyncio.create_task(self._pull_from_stream(s)).add_done_callback(
-                _print_task_errors
-            )
+            self._task = asyncio.create_task(self._pull_from_stream(s))
+            self._task.add_done_callback(_print_task_errors)
 
         async def next(self, with_status: bool = False) -> Packet[Any]:
             packet, status = None, None
@@ -127,28 +386,59 @@ def as_chan(s: sx.Stream[Packet[Any]]) -> Channel[_T]:
                 if p.packet_type == PacketType.CANCELLATION_PACKET:
                     self._bad_tags.add(p.payload)
                 elif self._bad_tags & set(p.tags):
+                    if mx.recorder:
+                        mx.recorder.count(f"{name}.dropped")
                     # Skip this packet and try the next one.
                     return await self.next(with_status=with_status)
+                if mx.recorder:
+                    mx.recorder.observe(
+                        f"{name}.packet_age_s", time.time() - p.created_at / 1000
+                    )
 
             if with_status:
                 return packet, status
             return packet
 
         async def _pull_from_stream(self, s: sx.Stream[Packet[Any]]):
-            async for p in s:
-                await self._pq.put(p)
-            self._pq.shutdown()
+            try:
+                async for p in s:
+                    if (
+                        dedup is not None
+                        and p.packet_type == PacketType.DATA
+                        and not dedup.add(p.packet_id)
+                    ):
+                        if mx.recorder:
+                            mx.recorder.count(f"{name}.duplicates")
+                        continue
+                    await self._pq.put(p)
+                    if mx.recorder:
+                        mx.recorder.high_water_mark(
+                            f"{name}.queue_depth", self._pq.qsize()
+                        )
+            except TimeoutError:
+                # Shuts down at the deadline. See `sx.deadline`.
+                if not sx.deadline_exceeded():
+                    raise
+            finally:
+                self._pq.shutdown()
+                await s.aclose()
+
+        async def aclose(self):
+            """Stops pulling the packets and closes the stream."""
+            if not self._task.done():
+                self._task.cancel()
+                await asyncio.wait([self._task])
 
     return _ChanStream()
 
 
 # FIXME: This is a hack to print errors in async tasks.
 def _print_task_errors(task: asyncio.Task):
-    if task.exception():
+    if not task.cancelled() and task.exception():
         task.print_stack()
         print(f"Task failed with exception: {task.exception()}")
 
-# %% ../nbs/01_channels.ipynb 18
+# %% ../nbs/01_channels.ipynb 29
 class ChannelWriter(sx.StreamWriter[Packet[Any]], Generic[_T]):
     elm_type: type[_T]  # Main packet payload type of the channel
 
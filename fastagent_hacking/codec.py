@@ -0,0 +1,178 @@
+"""Fast binary serialization of messages."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/09_codec.ipynb.
+
+# %% ../nbs/09_codec.ipynb 3
+from __future__ import annotations
+
+import dataclasses
+import functools
+import io
+import struct
+from typing import BinaryIO, Iterable, Iterator
+
+import fastagent_hacking.llms as lx
+
+Image = lx._lazy_import("PIL.Image")
+
+# %% auto 0
+__all__ = ['Image', 'EncodedImage', 'encode', 'decode', 'dump', 'iter_decode']
+
+# %% ../nbs/09_codec.ipynb 9
+# The layouts are compiled once.
+_FRAME_SIZE = struct.Struct("<I")
+_HEADER = struct.Struct("<BBHH")
+_COUNT = struct.Struct("<I")
+_LEAF = struct.Struct("<BI")
+
+_MSG, _CHUNK = 0, 1
+_END, _SEQ = 1, 2
+_STR, _BYTES, _IMAGE = 0, 1, 2
+
+# %% ../nbs/09_codec.ipynb 10
+@dataclasses.dataclass(frozen=True)
+class EncodedImage:
+    """An image kept in its encoded form, e.g. PNG, and decoded on access.
+
+    Encoding an `EncodedImage` copies its data as is, so relaying messages doesn't
+    decode and re-encode their images.
+    """
+
+    data: bytes
+
+    @functools.cached_property
+    def image(self) -> Image.Image:
+        return Image.open(io.BytesIO(self.data))
+
+# %% ../nbs/09_codec.ipynb 11
+def _encode_image(img: Image.Image) -> bytes:
+    buff = io.BytesIO()
+    # The lowest compression is several times faster, and still lossless.
+    img.save(buff, format="PNG", compress_level=1)
+    return buff.getvalue()
+
+
+def _encode_leaf(leaf, parts: list):
+    if isinstance(leaf, str):
+        tag, data = _STR, leaf.encode()
+    elif isinstance(leaf, bytes):
+        tag, data = _BYTES, leaf
+    elif isinstance(leaf, EncodedImage):
+        tag, data = _IMAGE, leaf.data
+    elif lx._is_image(leaf):
+        tag, data = _IMAGE, _encode_image(leaf)
+    else:
+        raise ValueError(f"Cannot serialize {leaf} with type {type(leaf)}")
+    parts.append(_LEAF.pack(tag, len(data)))
+    parts.append(data)
+
+
+def encode(msg: lx.Msg | lx.MsgChunk) -> bytes:
+    """Serializes a message into a single frame."""
+    if isinstance(msg, lx.MsgChunk):
+        kind, flags = _CHUNK, _END if msg.end else 0
+    elif isinstance(msg, lx.Msg):
+        kind, flags = _MSG, 0
+    else:
+        raise ValueError(f"Cannot serialize {msg} with type {type(msg)}")
+
+    role, name = msg.role.encode(), msg.name.encode()
+    parts = [b"", _HEADER.pack(kind, flags, len(role), len(name)), role, name]
+    if isinstance(msg.content, (list, tuple)):
+        parts[1] = _HEADER.pack(kind, flags | _SEQ, len(role), len(name))
+        parts.append(_COUNT.pack(len(msg.content)))
+        for leaf in msg.content:
+            _encode_leaf(leaf, parts)
+    else:
+        _encode_leaf(msg.content, parts)
+
+    parts[0] = _FRAME_SIZE.pack(sum(len(p) for p in parts))
+    return b"".join(parts)
+
+# %% ../nbs/09_codec.ipynb 12
+def _decode_leaf(buf: memoryview, pos: int, lazy_images: bool):
+    tag, size = _LEAF.unpack_from(buf, pos)
+    pos += _LEAF.size
+    data = bytes(buf[pos : pos + size])
+    pos += size
+    if tag == _STR:
+        return data.decode(), pos
+    if tag == _BYTES:
+        return data, pos
+    if tag == _IMAGE:
+        img = EncodedImage(data)
+        return (img if lazy_images else img.image), pos
+    raise ValueError(f"Invalid leaf tag: {tag}")
+
+
+def _decode_frame(buf: memoryview, *, lazy_images: bool) -> lx.Msg | lx.MsgChunk:
+    kind, flags, role_size, name_size = _HEADER.unpack_from(buf)
+    pos = _HEADER.size
+    role = str(buf[pos : pos + role_size], "utf-8")
+    pos += role_size
+    name = str(buf[pos : pos + name_size], "utf-8")
+    pos += name_size
+
+    if flags & _SEQ:
+        [n] = _COUNT.unpack_from(buf, pos)
+        pos += _COUNT.size
+        content = []
+        for _ in range(n):
+            leaf, pos = _decode_leaf(buf, pos, lazy_images)
+            content.append(leaf)
+    else:
+        content, pos = _decode_leaf(buf, pos, lazy_images)
+
+    if pos != len(buf):
+        raise ValueError(f"Invalid frame: {len(buf) - pos} trailing bytes")
+    if kind == _CHUNK:
+        return lx.MsgChunk(
+            role=role, content=content, end=bool(flags & _END), name=name
+        )
+    if kind == _MSG:
+        return lx.Msg(role=role, content=content, name=name)
+    raise ValueError(f"Invalid message kind: {kind}")
+
+
+def decode(data: bytes, *, lazy_images: bool = False) -> lx.Msg | lx.MsgChunk:
+    """Deserializes a message from a single frame.
+
+    Args:
+      data: The frame.
+      lazy_images: If True, the images are returned as `EncodedImage`s,
+        which are only decoded when their `image` is accessed.
+    """
+    buf = memoryview(data)
+    [size] = _FRAME_SIZE.unpack_from(buf)
+    if size != len(buf) - _FRAME_SIZE.size:
+        raise ValueError(
+            f"Invalid frame size: {size}, expected {len(buf) - _FRAME_SIZE.size}"
+        )
+    return _decode_frame(buf[_FRAME_SIZE.size :], lazy_images=lazy_images)
+
+# %% ../nbs/09_codec.ipynb 18
+def dump(msgs: Iterable[lx.Msg | lx.MsgChunk], f: BinaryIO):
+    """Writes the messages to a binary file."""
+    for msg in msgs:
+        f.write(encode(msg))
+
+
+def iter_decode(
+    f: BinaryIO, *, lazy_images: bool = False
+) -> Iterator[lx.Msg | lx.MsgChunk]:
+    """Reads the messages of a binary file one at a time.
+
+    Only one frame is held in memory, so large transcripts can be streamed.
+
+    Args:
+      f: The file, positioned at the start of a frame.
+      lazy_images: See `decode`.
+    """
+    while header := f.read(_FRAME_SIZE.size):
+        if len(header) < _FRAME_SIZE.size:
+            raise ValueError("Truncated frame header")
+        [size] = _FRAME_SIZE.unpack(header)
+        data = f.read(size)
+        if len(data) < size:
+            raise ValueError(f"Truncated frame: got {len(data)} of {size} bytes")
+        yield _decode_frame(memoryview(data), lazy_images=lazy_images)
@@ -0,0 +1,120 @@
+"""Local backends for tests and benchmarks."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_fakes.ipynb.
+
+# %% auto 0
+__all__ = ['FakeBackend']
+
+# %% ../nbs/07_fakes.ipynb 3
+import asyncio
+import random
+import re
+from typing import Callable, Sequence
+
+import fastagent_hacking.transforms as tx
+import fastagent_hacking.llms as lx
+
+# %% ../nbs/07_fakes.ipynb 8
+def _tokenize(text: str) -> list[str]:
+    """Splits `text` into word tokens that keep their leading whitespace."""
+    return re.findall(r"\s*\S+", text)
+
+
+def _echo(msgs: Sequence[lx.MsgLike]) -> str:
+    last = msgs[-1].content if isinstance(msgs[-1], lx.Msg) else msgs[-1]
+    return last if isinstance(last, str) else ""
+
+# %% ../nbs/07_fakes.ipynb 10
+class FakeBackend(lx.Backend):
+    """A deterministic local backend that streams synthetic or recorded responses.
+
+    Args:
+      responses: The responses of the successive calls, reused in a round robin.
+        A response is either a string, streamed one word at a time, or a sequence of
+        chunks (e.g. the contents of the chunks recorded from a real backend).
+        It can also be a function of the messages. Defaults to echoing the last message.
+      model: The name of the fake model.
+      ttft_s: The time to first token, in seconds.
+      tokens_per_s: Optional. The streaming rate after the first token.
+        If None, the tokens are streamed without delay.
+      failure_rate: The probability that a call fails before streaming anything.
+      midstream_failure_rate: The probability that a call fails after streaming
+        some of its chunks.
+      error: The type of the injected errors.
+      seed: The seed of the failure injection.
+    """
+
+    def __init__(
+        self,
+        responses: (
+            Sequence[str | Sequence[str]] | Callable[[Sequence[lx.MsgLike]], str]
+        ) = _echo,
+        *,
+        model: str = "fake",
+        ttft_s: float = 0.0,
+        tokens_per_s: float | None = None,
+        failure_rate: float = 0.0,
+        midstream_failure_rate: float = 0.0,
+        error: type[Exception] = ConnectionError,
+        seed: int = 0,
+    ):
+        self._responses = responses
+        self._model = model
+        self._ttft_s = ttft_s
+        self._tokens_per_s = tokens_per_s
+        self._failure_rate = failure_rate
+        self._midstream_failure_rate = midstream_failure_rate
+        self._error = error
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @tx.tfn
+    async def chat(
+        self,
+        msgs: Sequence[lx.MsgLike],
+        *,
+        name: str = "",
+        temperature: float | None = None,
+        sink=None,
+    ) -> lx.Msg:
+        i = self.calls
+        self.calls += 1
+
+        chunks = self._chunks(i, msgs)
+        fail_at = None
+        r = self._rng.random()
+        if r < self._failure_rate:
+            fail_at = 0
+        elif r < self._failure_rate + self._midstream_failure_rate:
+            fail_at = self._rng.randrange(1, len(chunks)) if len(chunks) > 1 else 0
+
+        await asyncio.sleep(self._ttft_s)
+        for j, chunk in enumerate(chunks):
+            if j == fail_at:
+                raise self._error(f"Injected failure in call {i} after {j} chunks.")
+            if j:
+                await asyncio.sleep(1 / self._tokens_per_s if self._tokens_per_s else 0)
+            if sink:
+                await sink.put(
+                    lx.MsgChunk(
+                        role="assistant",
+                        content=chunk,
+                        end=j == len(chunks) - 1,
+                        name=name,
+                    )
+                )
+        return lx.Msg(role="assistant", content="".join(chunks), name=name)
+
+    def _chunks(self, i: int, msgs: Sequence[lx.MsgLike]) -> list[str]:
+        if callable(self._responses):
+            resp = self._responses(msgs)
+        else:
+            resp = self._responses[i % len(self._responses)]
+
+        chunks = _tokenize(resp) if isinstance(resp, str) else list(resp)
+        # Like the real APIs, always end the stream with a chunk.
+        return chunks or [""]
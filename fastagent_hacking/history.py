@@ -0,0 +1,118 @@
+"""Persistent chat history stores."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/10_history.ipynb.
+
+# %% auto 0
+__all__ = ['LogHistoryStore']
+
+# %% ../nbs/10_history.ipynb 3
+import array
+import asyncio
+import collections
+import hashlib
+import mmap
+import os
+import struct
+from typing import Sequence
+
+import fastagent_hacking.codec as codec
+import fastagent_hacking.llms as lx
+
+# %% ../nbs/10_history.ipynb 8
+# A session key and the offset of a message in the log.
+_INDEX_ENTRY = struct.Struct("<16sQ")
+_FRAME_SIZE = struct.Struct("<I")
+
+
+def _session_key(session: str) -> bytes:
+    return hashlib.blake2b(session.encode(), digest_size=16).digest()
+
+# %% ../nbs/10_history.ipynb 9
+class LogHistoryStore(lx.HistoryStore):
+    """Stores the chat histories in an append-only log file with an offset index.
+
+    Only the index is loaded in memory (24 bytes per message). The messages are
+    read lazily, so a worker can resume many sessions without loading their
+    histories. The file operations run in a thread, off the event loop.
+
+    The files are consistent after a crash: a message is only indexed once it's
+    fully written, and the unindexed end of the log is dropped on open.
+
+    Args:
+      path: The path prefix of the files, `{path}.log` and `{path}.idx`.
+    """
+
+    def __init__(self, path: str):
+        self._log = open(f"{path}.log", "ab+")
+        self._idx = open(f"{path}.idx", "ab+")
+        self._offsets = collections.defaultdict(lambda: array.array("Q"))
+        self._end = 0
+        self._mmap = None
+        # Serializes the file operations, in call order.
+        self._lock = asyncio.Lock()
+        self._load_index()
+
+    async def append(self, session: str, msgs: Sequence[lx.Msg]):
+        async with self._lock:
+            await asyncio.to_thread(self._append, _session_key(session), msgs)
+
+    async def load(self, session: str, *, last: int | None = None) -> list[lx.Msg]:
+        async with self._lock:
+            return await asyncio.to_thread(self._load, _session_key(session), last)
+
+    def close(self):
+        if self._mmap:
+            self._mmap.close()
+        self._log.close()
+        self._idx.close()
+
+    def _load_index(self):
+        self._idx.seek(0)
+        data = self._idx.read()
+        n = len(data) // _INDEX_ENTRY.size
+        for key, offset in _INDEX_ENTRY.iter_unpack(data[: n * _INDEX_ENTRY.size]):
+            self._offsets[key].append(offset)
+            self._end = offset
+        if n:
+            self._log.seek(self._end)
+            [size] = _FRAME_SIZE.unpack(self._log.read(_FRAME_SIZE.size))
+            self._end += _FRAME_SIZE.size + size
+
+        # Drop the partial writes of a crash.
+        self._idx.truncate(n * _INDEX_ENTRY.size)
+        self._log.truncate(self._end)
+
+    def _append(self, key: bytes, msgs: Sequence[lx.Msg]):
+        frames = [codec.encode(msg) for msg in msgs]
+        offsets, end = [], self._end
+        for frame in frames:
+            offsets.append(end)
+            end += len(frame)
+
+        self._log.write(b"".join(frames))
+        self._log.flush()
+        self._idx.write(b"".join(_INDEX_ENTRY.pack(key, o) for o in offsets))
+        self._idx.flush()
+        self._end = end
+        self._offsets[key].extend(offsets)
+
+    def _load(self, key: bytes, last: int | None) -> list[lx.Msg]:
+        offsets = self._offsets.get(key, [])
+        if last is not None:
+            offsets = offsets[max(len(offsets) - last, 0) :]
+        if not offsets:
+            return []
+
+        if self._mmap is None or len(self._mmap) < self._end:
+            # The log grew since it was mapped.
+            if self._mmap:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._log.fileno(), 0, access=mmap.ACCESS_READ)
+
+        msgs = []
+        for offset in offsets:
+            [size] = _FRAME_SIZE.unpack_from(self._mmap, offset)
+            msgs.append(
+                codec.decode(self._mmap[offset : offset + _FRAME_SIZE.size + size])
+            )
+        return msgs
@@ -2,47 +2,121 @@
 
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_llms.ipynb.
 
-# %% auto 0
-__all__ = ['MsgContent', 'MsgLike', 'Msg', 'MsgChunk', 'Backend', 'OpenaiAPI', 'Chat']
-
 # %% ../nbs/03_llms.ipynb 3
+from __future__ import annotations
+
 import abc
+import asyncio
+import collections
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import sys
+import time
+import weakref
 from dataclasses import dataclass, field
-from dataclasses_json import dataclass_json, config
-from typing import Any, Sequence
+from typing import Any, Awaitable, Callable, Iterable, Sequence, Union
 import io
 import base64
+import json
+import os
+import re
 
-import openai
-import msglm
-from PIL import Image
 from fastcore import imghdr
 
 from . import transforms as tx
 from . import channels as cx
 from . import streams as sx
+from . import metrics as mx
+
+# %% auto 0
+__all__ = ['MsgContent', 'MsgLike', 'client_pool', 'Msg', 'MsgChunk', 'Backend', 'PoolStats', 'ClientPool', 'ImageOptions',
+           'encode_image', 'OpenaiAPI', 'HistoryStore', 'Chat', 'JsonEvent', 'JsonParser', 'ParseJson', 'Embed']
 
 # %% ../nbs/03_llms.ipynb 8
+def _lazy_import(name: str):
+    """Returns the module `name`, which is only executed on its first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+np = _lazy_import("numpy")
+openai = _lazy_import("openai")
+httpx = _lazy_import("httpx")
+msglm = _lazy_import("msglm")
+Image = _lazy_import("PIL.Image")
+dataclasses_json = _lazy_import("dataclasses_json")
+
+
+def _is_image(x: Any) -> bool:
+    # Only PIL's modules define images, so checking the module of `x` first
+    # doesn't import PIL for other types.
+    return type(x).__module__.startswith("PIL.") and isinstance(x, Image.Image)
+
+
+def _is_encoded_image(x: Any) -> bool:
+    """Whether `x` is a `codec.EncodedImage`."""
+    if type(x).__module__ != "fastagent_hacking.codec":
+        return False
+    # `codec` imports this module, so it's only imported here.
+    from fastagent_hacking.codec import EncodedImage
+
+    return isinstance(x, EncodedImage)
+
+
+def _dataclass_json(cls):
+    """Like `dataclasses_json.dataclass_json`, but imports `dataclasses_json` on first use."""
+
+    def method(name):
+
+        def load(self, *args, **kwargs):
+            # Replaces the placeholders with the actual methods.
+            dataclasses_json.dataclass_json(cls)
+            return getattr(self, name)(*args, **kwargs)
+
+        return load
+
+    for name in ("to_json", "to_dict"):
+        setattr(cls, name, method(name))
+    for name in ("from_json", "from_dict", "schema"):
+        setattr(cls, name, classmethod(method(name)))
+    return cls
+
+# %% ../nbs/03_llms.ipynb 14
 # The basic unit of a message is either a string, image or raw bytes.
-_MsgLeafContent = str | Image.Image | bytes
+# The image type is a forward reference to not import PIL.
+_MsgLeafContent = Union[str, "Image.Image", bytes]
 
 # A message can be a single leaf content or a sequence of leaf contents.
 MsgContent = _MsgLeafContent | Sequence[_MsgLeafContent]
 
-# %% ../nbs/03_llms.ipynb 9
+# %% ../nbs/03_llms.ipynb 15
 # Utils for encoding/decoding messages.
 
 _TYPE_KEY = "__type__"
 
 
 def _encode(content: MsgContent) -> Any:
-    if isinstance(content, Image.Image):
+    if _is_image(content):
         buff = io.BytesIO()
         content.save(buff, format="PNG")
         return {
             _TYPE_KEY: "PIL.Image",
             "data": base64.b64encode(buff.getvalue()).decode(),
         }
+    elif _is_encoded_image(content):
+        # Its data is copied in its encoded format.
+        return {_TYPE_KEY: "PIL.Image", "data": base64.b64encode(content.data).decode()}
     elif isinstance(content, bytes):
         return {"__type__": "bytes", "data": base64.b64encode(content).decode()}
     elif isinstance(content, (list, tuple)):
@@ -67,8 +141,8 @@ def _decode(content: Any) -> MsgContent:
 
     raise ValueError(f"Cannot deserialize {content} with type {type(content)}")
 
-# %% ../nbs/03_llms.ipynb 10
-@dataclass_json
+# %% ../nbs/03_llms.ipynb 16
+@_dataclass_json
 @dataclass(frozen=True)
 class Msg:
     """A message in a chat.
@@ -84,31 +158,140 @@ class Msg:
 
     role: str
     content: MsgContent = field(
-        metadata=config(
-            encoder=_encode,
-            decoder=_decode,
-        )
+        metadata={
+            "dataclasses_json": {
+                "encoder": _encode,
+                "decoder": _decode,
+            }
+        }
     )
     name: str = ""
 
-# %% ../nbs/03_llms.ipynb 11
-@dataclass_json
+# %% ../nbs/03_llms.ipynb 17
+@_dataclass_json
 @dataclass(frozen=True)
 class MsgChunk:
     role: str
     content: MsgContent = field(
-        metadata=config(
-            encoder=_encode,
-            decoder=_decode,
-        )
+        metadata={
+            "dataclasses_json": {
+                "encoder": _encode,
+                "decoder": _decode,
+            }
+        }
     )
     end: bool
     name: str = ""
 
-# %% ../nbs/03_llms.ipynb 15
+# %% ../nbs/03_llms.ipynb 21
 MsgLike = Msg | MsgContent
 
-# %% ../nbs/03_llms.ipynb 16
+# %% ../nbs/03_llms.ipynb 22
+class _EmbedBatcher:
+    """Merges concurrent embedding calls into batched requests.
+
+    The texts of the calls made while a batch is pending are queued together,
+    and sent in requests of at most `max_batch_size` texts. The embeddings are
+    cached by the hash of their text.
+
+    Args:
+      embed: Sends one embedding request and returns an array of shape (len(texts), dim).
+      max_batch_size: The maximum number of texts per request.
+      max_delay_s: How long to wait for other calls before sending a batch.
+      cache_size: The maximum number of cached embeddings.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[Sequence[str]], Awaitable[np.ndarray]],
+        *,
+        max_batch_size: int,
+        max_delay_s: float,
+        cache_size: int,
+    ):
+        self._embed = embed
+        self._max_batch_size = max_batch_size
+        self._max_delay_s = max_delay_s
+        self._cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        # Maps the key of each queued or in flight text to the future of its embedding.
+        self._pending = {}
+        self._queue = []
+        self._timer = None
+        self._tasks = set()
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        keys = [hashlib.sha256(t.encode()).digest() for t in texts]
+
+        # The cached rows are read now, as concurrent batches can evict them while waiting.
+        futs, cached = {}, {}
+        for key, text in zip(keys, texts):
+            if key in futs or key in cached:
+                continue
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                cached[key] = self._cache[key]
+                continue
+            if key not in self._pending:
+                self._pending[key] = asyncio.get_running_loop().create_future()
+                self._queue.append((key, text))
+            futs[key] = self._pending[key]
+        self._schedule()
+
+        if futs:
+            # Don't use `gather`: cancelling this call mustn't cancel the futures
+            # shared with other calls.
+            await asyncio.wait(futs.values())
+
+        rows = [cached[key] if key in cached else futs[key].result() for key in keys]
+        if not rows:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(rows)
+
+    def _schedule(self):
+        while len(self._queue) >= self._max_batch_size:
+            self._flush()
+        if self._queue and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._max_delay_s, self._flush
+            )
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = self._queue[: self._max_batch_size]
+        del self._queue[: self._max_batch_size]
+        if batch:
+            t = asyncio.create_task(self._run(batch))
+            self._tasks.add(t)
+            t.add_done_callback(self._tasks.discard)
+        self._schedule()
+
+    async def _run(self, batch: list[tuple[bytes, str]]):
+        try:
+            vecs = np.asarray(
+                await self._embed([text for _, text in batch]), dtype=np.float32
+            )
+            assert len(vecs) == len(
+                batch
+            ), f"Expected {len(batch)} embeddings, got {len(vecs)}"
+        except asyncio.CancelledError:
+            for key, _ in batch:
+                self._pending.pop(key).cancel()
+            raise
+        except Exception as e:
+            for key, _ in batch:
+                self._pending.pop(key).set_exception(e)
+            return
+
+        for (key, _), vec in zip(batch, vecs):
+            self._pending.pop(key).set_result(vec)
+            self._cache[key] = vec
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+# %% ../nbs/03_llms.ipynb 23
 class Backend(abc.ABC):
 
     @abc.abstractmethod
@@ -135,14 +318,330 @@ class Backend(abc.ABC):
           sink: Internal use only. Defaults to None.
         """
 
-    # TODO: Add emebd method.
+    def chat_batch(
+        self,
+        batch: Iterable[Sequence[MsgLike]] | sx.Stream[Sequence[MsgLike]],
+        *,
+        temperature: float | None = None,
+    ) -> sx.Stream[Msg | None]:
+        """Returns the chat responses to a batch of message sequences, in input order.
+
+        Backends with an offline batch API (cheaper, but slower) override this method.
+        By default, the requests are sent one at a time through `chat`.
+
+        Args:
+          batch: The message sequences. See `chat` for the format of each sequence.
+          temperature: Optional. The temperature of the responses.
+            If None, the backend will use its default value.
+
+        Returns:
+          A stream of the responses. A response is None if its request failed.
+        """
+
+        async def chat(msgs: Sequence[MsgLike]) -> Msg | None:
+            try:
+                return await self.chat(msgs, temperature=temperature)
+            except Exception:
+                return None
+
+        return sx.map(chat, sx.of(batch))
+
+    # The maximum number of texts per embedding request. Concurrent `embed` calls
+    # made within `embed_max_delay_s` are merged into the same request.
+    embed_batch_size: int = 2048
+    embed_max_delay_s: float = 0.005
+    # The number of embeddings cached by the hash of their text.
+    embed_cache_size: int = 10_000
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Returns the embeddings of the texts.
+
+        Concurrent calls are merged into requests of at most `embed_batch_size` texts,
+        and the texts that were recently embedded are not embedded again.
+
+        Args:
+          texts: The texts to embed.
 
-# %% ../nbs/03_llms.ipynb 18
+        Returns:
+          A contiguous float32 array of shape (len(texts), dim). Without texts, its
+          shape is (0, 0), as the dimension is only known from a request.
+        """
+        return await self._embed_batcher.embed(texts)
+
+    async def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Sends a single embedding request. Backends supporting embeddings override it."""
+        raise NotImplementedError(f"{type(self).__name__} doesn't support embeddings.")
+
+    @functools.cached_property
+    def _embed_batcher(self) -> _EmbedBatcher:
+        return _EmbedBatcher(
+            self._embed,
+            max_batch_size=self.embed_batch_size,
+            max_delay_s=self.embed_max_delay_s,
+            cache_size=self.embed_cache_size,
+        )
+
+# %% ../nbs/03_llms.ipynb 25
+class _BatchCheckpoint:
+    """Records the ids of the submitted batch jobs in a JSON file."""
+
+    def __init__(self, path: str | None):
+        self._path = path
+        self._jobs = []
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._jobs = json.load(f)["jobs"]
+
+    def job(self, idx: int) -> str | None:
+        """Returns the id of the `idx`-th job if it was submitted."""
+        return self._jobs[idx] if idx < len(self._jobs) else None
+
+    def add_job(self, job_id: str):
+        self._jobs.append(job_id)
+        if self._path:
+            # Replace the file atomically so that a crash can't corrupt it.
+            tmp = f"{self._path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"jobs": self._jobs}, f)
+            os.replace(tmp, self._path)
+
+# %% ../nbs/03_llms.ipynb 26
+@dataclass(frozen=True)
+class PoolStats:
+    """The utilisation of the connections to an API.
+
+    Attributes:
+      connections: The number of open connections.
+      idle: The number of open connections without in-flight requests.
+      queued: The number of requests waiting for a connection.
+    """
+
+    connections: int = 0
+    idle: int = 0
+    queued: int = 0
+
+
+class ClientPool:
+    """Shares the OpenAI clients, and their connections, across the backends.
+
+    Backends with the same base URL and API key share a client, so they reuse
+    its kept-alive connections instead of opening their own (with their TCP and
+    TLS handshakes). The connections are bound to an event loop, so each loop has
+    its own clients.
+
+    Args:
+      max_connections: The maximum number of connections per client.
+      max_keepalive_connections: The maximum number of idle connections kept per client.
+      keepalive_expiry_s: How long idle connections are kept.
+      http2: Whether to use HTTP/2, which multiplexes the requests over fewer
+        connections. Requires the `h2` package.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_s: float = 30.0,
+        http2: bool = False,
+    ):
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+        self._keepalive_expiry_s = keepalive_expiry_s
+        self._http2 = http2
+        # Maps each loop to its clients, by (base URL, API key), with their HTTP client.
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def client(
+        self, *, api_key: str | None = None, base_url: str | None = None
+    ) -> openai.AsyncOpenAI:
+        """Returns the client of `base_url` and `api_key` in the running loop, created on first use.
+
+        Args:
+          api_key: Optional. Defaults to the `OPENAI_API_KEY` environment variable.
+          base_url: Optional. Defaults to the `OPENAI_BASE_URL` environment variable,
+            or the OpenAI API.
+        """
+        return self._entry(api_key, base_url)[0]
+
+    def _entry(
+        self, api_key: str | None, base_url: str | None
+    ) -> tuple[openai.AsyncOpenAI, httpx.AsyncClient]:
+        key = (
+            base_url or os.environ.get("OPENAI_BASE_URL"),
+            api_key or os.environ.get("OPENAI_API_KEY"),
+        )
+        # The clients of the closed loops can't send requests anymore.
+        for loop in [loop for loop in self._clients if loop.is_closed()]:
+            del self._clients[loop]
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        if key not in clients:
+            http = openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_keepalive_connections,
+                    keepalive_expiry=self._keepalive_expiry_s,
+                ),
+                http2=self._http2,
+            )
+            client = openai.AsyncOpenAI(
+                api_key=key[1], base_url=key[0], http_client=http
+            )
+            clients[key] = (client, http)
+        return clients[key]
+
+    async def warm(
+        self, n: int = 1, *, api_key: str | None = None, base_url: str | None = None
+    ):
+        """Opens up to `n` connections ahead of the first requests, e.g. at startup.
+
+        See `client` for the arguments.
+        """
+        client, http = self._entry(api_key, base_url)
+        # Concurrent requests open a connection each. Any response, e.g. a 404,
+        # keeps its connection alive.
+        await asyncio.gather(
+            *(http.head(str(client.base_url)) for _ in range(n)), return_exceptions=True
+        )
+
+    def stats(self) -> dict[str, PoolStats]:
+        """Returns the utilisation of the connections, by base URL."""
+        stats = collections.defaultdict(PoolStats)
+        for client, http in (
+            entry
+            for clients in list(self._clients.values())
+            for entry in clients.values()
+        ):
+            # The connection pool of httpx's default transport.
+            pool = getattr(getattr(http, "_transport", None), "_pool", None)
+            if pool is None:
+                continue
+            s = stats[str(client.base_url)]
+            stats[str(client.base_url)] = PoolStats(
+                connections=s.connections + len(pool.connections),
+                idle=s.idle + sum(c.is_idle() for c in pool.connections),
+                queued=s.queued + sum(r.is_queued() for r in pool._requests),
+            )
+        return dict(stats)
+
+    async def aclose(self):
+        """Closes the clients of the running loop and their connections."""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        await asyncio.gather(*(http.aclose() for _, http in clients.values()))
+
+
+# The process-wide pool, used by default.
+client_pool = ClientPool()
+
+# %% ../nbs/03_llms.ipynb 27
+@dataclass(frozen=True)
+class ImageOptions:
+    """How the images are encoded before being uploaded.
+
+    The defaults match the effective resolution of the OpenAI API, which scales the
+    images to fit in 2048x2048, then their shortest side to 768 pixels.
+    `ImageOptions(max_size=None, max_short_side=None, format="PNG")` uploads the
+    images as they are.
+
+    Attributes:
+      max_size: Optional. The (width, height) the images are downscaled to fit in.
+      max_short_side: Optional. The max length of the shortest side of the images.
+      format: "PNG", "JPEG", "WEBP", or "auto" for PNG if the image has
+        transparency and JPEG otherwise.
+      quality: The quality of the lossy formats, from 1 to 100.
+      executor: Optional. Where to encode the images, e.g. "thread" to keep them
+        from blocking the loop. See `sx.streamify`.
+    """
+
+    max_size: tuple[int, int] | None = (2048, 2048)
+    max_short_side: int | None = 768
+    format: str = "auto"
+    quality: int = 85
+    executor: sx.Executor | None = None
+
+
+def _has_alpha(img: Image.Image) -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+
+
+def _scale(size: tuple[int, int], opts: ImageOptions) -> float:
+    """Returns the factor an image of `size` is downscaled by, at most 1."""
+    w, h = size
+    scale = 1.0
+    if opts.max_size:
+        scale = min(scale, opts.max_size[0] / w, opts.max_size[1] / h)
+    if opts.max_short_side:
+        scale = min(scale, opts.max_short_side / min(w, h))
+    return scale
+
+
+def encode_image(img: Image.Image, opts: ImageOptions = ImageOptions()) -> bytes:
+    """Downscales and encodes an image as set by `opts`. Images are never upscaled."""
+    w, h = img.size
+    scale = _scale(img.size, opts)
+    if scale < 1:
+        img = img.resize(
+            (max(1, round(w * scale)), max(1, round(h * scale))),
+            Image.Resampling.LANCZOS,
+        )
+
+    fmt = opts.format.upper()
+    if fmt == "AUTO":
+        fmt = "PNG" if _has_alpha(img) else "JPEG"
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    buff = io.BytesIO()
+    img.save(buff, format=fmt, **({} if fmt == "PNG" else {"quality": opts.quality}))
+    return buff.getvalue()
+
+# %% ../nbs/03_llms.ipynb 30
 class OpenaiAPI(Backend):
+    """Backend for the OpenAI API.
 
-    def __init__(self, *, model: str, api_key: str | None = None):
-        self._client = openai.AsyncOpenAI(api_key=api_key)
+    Args:
+      model: The name of the model.
+      api_key: Optional. Defaults to the `OPENAI_API_KEY` environment variable.
+      base_url: Optional. Defaults to the `OPENAI_BASE_URL` environment variable,
+        or the OpenAI API.
+      client: Optional. The client used to send the requests. If set,
+        `api_key`, `base_url` and `pool` are ignored.
+      embed_model: The name of the embedding model.
+      pool: The pool sharing the clients across backends. Defaults to the
+        process-wide `client_pool`.
+      images: How the images are downscaled and encoded before being uploaded.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        client: openai.AsyncOpenAI | None = None,
+        embed_model: str = "text-embedding-3-small",
+        pool: ClientPool | None = None,
+        images: ImageOptions = ImageOptions(),
+    ):
+        self._pool = None if client else pool or client_pool
+        self._own_client = client
+        self._api_key = api_key
+        self._base_url = base_url
         self._model = model
+        self._embed_model = embed_model
+        self._images = images
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def _client(self) -> openai.AsyncOpenAI:
+        # The pooled clients are the ones of the running loop.
+        return self._own_client or self._pool.client(
+            api_key=self._api_key, base_url=self._base_url
+        )
 
     @tx.tfn
     async def chat(
@@ -153,42 +652,260 @@ class OpenaiAPI(Backend):
         temperature: float | None = None,
         sink=None,
     ) -> Msg:
+        # The request gets the remaining latency budget, if any. See `sx.deadline`.
+        timeout = sx.remaining()
+        if timeout is not None and timeout <= 0:
+            # Sheds the request instead of sending it late.
+            raise TimeoutError("The deadline passed before sending the request.")
+        encoded = await self._encode_images(msgs)
         stream = await self._client.chat.completions.create(
-            messages=[self._to_openai_msg(msg) for msg in msgs],
+            messages=[self._to_openai_msg(msg, encoded=encoded) for msg in msgs],
             model=self._model,
             temperature=temperature,
             stream=True,
+            timeout=openai.NOT_GIVEN if timeout is None else timeout,
         )
+        if self._pool and (rec := mx.recorder):
+            self._record_pool(rec)
         content = ""
-        async for chunk in stream:
-            [choice] = chunk.choices
-            delta = choice.delta.content or ""
-            end = choice.finish_reason is not None
-            content += delta
-            if sink:
-                await sink.put(
-                    MsgChunk(
-                        role="assistant",
-                        content=delta,
-                        end=end,
-                        name=name,
+        aborted = False
+        try:
+            async for chunk in stream:
+                [choice] = chunk.choices
+                delta = choice.delta.content or ""
+                end = choice.finish_reason is not None
+                content += delta
+                if sink:
+                    await sink.put(
+                        MsgChunk(
+                            role="assistant",
+                            content=delta,
+                            end=end,
+                            name=name,
+                        )
                     )
-                )
+        except asyncio.CancelledError:
+            aborted = True
+            raise
+        finally:
+            # Closing an unfinished response closes its connection, which aborts
+            # the generation instead of downloading the remaining tokens.
+            start = time.perf_counter()
+            await stream.close()
+            if aborted and (rec := mx.recorder):
+                rec.count("OpenaiAPI.chat.aborted")
+                rec.observe("OpenaiAPI.chat.abort_s", time.perf_counter() - start)
         return Msg(role="assistant", content=content, name=name)
 
-    def _to_openai_msg(self, msg: Msg | MsgContent) -> dict:
+    def chat_batch(
+        self,
+        batch: Iterable[Sequence[MsgLike]] | sx.Stream[Sequence[MsgLike]],
+        *,
+        temperature: float | None = None,
+        checkpoint: str | None = None,
+        max_requests_per_job: int = 50_000,
+        poll_interval_s: float = 60.0,
+    ) -> sx.Stream[Msg | None]:
+        """Returns the chat responses to a batch of message sequences using the Batch API.
+
+        The requests are packed into JSONL files of at most `max_requests_per_job` requests,
+        each file being submitted as a batch job. The jobs are then polled and their
+        results are streamed in input order.
+
+        Args:
+          batch: The message sequences. See `chat` for the format of each sequence.
+          temperature: Optional. The temperature of the responses.
+          checkpoint: Optional. A file recording the submitted jobs. When the same batch
+            is processed again with the same checkpoint (e.g. after a crash), the
+            recorded jobs are polled instead of being submitted again.
+          max_requests_per_job: The maximum number of requests per job.
+          poll_interval_s: The delay between two polls of a running job.
+
+        Returns:
+          A stream of the responses. A response is None if its request failed.
+        """
+        return sx.streamify(self._chat_batch)(
+            batch,
+            temperature=temperature,
+            checkpoint=checkpoint,
+            max_requests_per_job=max_requests_per_job,
+            poll_interval_s=poll_interval_s,
+        )
+
+    async def _chat_batch(
+        self,
+        batch: Iterable[Sequence[MsgLike]] | sx.Stream[Sequence[MsgLike]],
+        *,
+        temperature: float | None,
+        checkpoint: str | None,
+        max_requests_per_job: int,
+        poll_interval_s: float,
+    ):
+        ckpt = _BatchCheckpoint(checkpoint)
+
+        # Submit all the jobs first so that they run concurrently.
+        jobs, lines = [], []
+
+        async def submit():
+            job_id = ckpt.job(len(jobs))
+            if job_id is None:
+                f = await self._client.files.create(
+                    file=("batch.jsonl", "".join(lines).encode()),
+                    purpose="batch",
+                )
+                job = await self._client.batches.create(
+                    input_file_id=f.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h",
+                )
+                job_id = job.id
+                ckpt.add_job(job_id)
+            jobs.append((job_id, len(lines)))
+            lines.clear()
+
+        async for msgs in sx.of(batch):
+            if ckpt.job(len(jobs)) is None:
+                lines.append(
+                    self._to_batch_line(msgs, idx=len(lines), temperature=temperature)
+                )
+            else:
+                lines.append("")  # Already submitted: only count the requests.
+            if len(lines) == max_requests_per_job:
+                await submit()
+        if lines:
+            await submit()
+
+        for job_id, n in jobs:
+            results = await self._wait_batch(job_id, poll_interval_s=poll_interval_s)
+            for i in range(n):
+                yield results.get(str(i))
+
+    async def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        resp = await self._client.embeddings.create(
+            model=self._embed_model,
+            input=list(texts),
+            encoding_format="float",
+        )
+        data = sorted(resp.data, key=lambda d: d.index)
+        return np.array([d.embedding for d in data], dtype=np.float32)
+
+    def _to_batch_line(
+        self,
+        msgs: Sequence[MsgLike],
+        *,
+        idx: int,
+        temperature: float | None,
+    ) -> str:
+        body = {
+            "model": self._model,
+            "messages": [self._to_openai_msg(msg) for msg in msgs],
+        }
+        if temperature is not None:
+            body["temperature"] = temperature
+        line = {
+            # The index of the request in its job.
+            "custom_id": str(idx),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": body,
+        }
+        return json.dumps(line) + "\n"
+
+    async def _wait_batch(
+        self, job_id: str, *, poll_interval_s: float
+    ) -> dict[str, Msg]:
+        """Waits for a job to finish and returns its responses keyed by their custom id."""
+        while True:
+            job = await self._client.batches.retrieve(job_id)
+            if job.status in ("completed", "failed", "expired", "cancelled"):
+                break
+            await asyncio.sleep(poll_interval_s)
+
+        if not job.output_file_id:
+            return {}
+
+        # Expired and cancelled jobs can still have partial results.
+        content = await self._client.files.content(job.output_file_id)
+        results = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            r = json.loads(line)
+            resp = r.get("response") or {}
+            if r.get("error") or resp.get("status_code") != 200:
+                continue
+            [choice] = resp["body"]["choices"]
+            results[r["custom_id"]] = Msg(
+                role="assistant", content=choice["message"]["content"] or ""
+            )
+        return results
+
+    def _record_pool(self, rec: mx.Recorder):
+        stats = self._pool.stats().get(str(self._client.base_url))
+        if stats:
+            rec.high_water_mark("OpenaiAPI.pool.connections", stats.connections)
+            rec.high_water_mark("OpenaiAPI.pool.active", stats.connections - stats.idle)
+            rec.high_water_mark("OpenaiAPI.pool.queued", stats.queued)
+
+    async def _encode_images(self, msgs: Sequence[MsgLike]) -> dict[int, bytes]:
+        """Encodes the images of the messages in the executor of the image options.
+
+        Returns the encoded images by their id, or nothing without executor.
+        """
+        leaves = [
+            d
+            for msg in msgs
+            for d in self._leaves(msg)
+            if self._image_to_encode(d) is not None
+        ]
+        ex = sx._resolve_executor(self._images.executor, encode_image)
+        if not leaves or ex is None:
+            return {}
+        loop = asyncio.get_running_loop()
+        encoded = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    ex, encode_image, self._image_to_encode(d), self._images
+                )
+                for d in leaves
+            ]
+        )
+        return {id(d): b for d, b in zip(leaves, encoded)}
+
+    def _image_to_encode(self, d: _MsgLeafContent) -> Image.Image | None:
+        """Returns the image to encode for the leaf `d`, or None if there's none.
+
+        The already encoded images (see `codec.EncodedImage`) are uploaded as they are,
+        unless they must be downscaled.
+        """
+        if _is_image(d):
+            return d
+        if _is_encoded_image(d) and _scale(d.image.size, self._images) < 1:
+            return d.image
+        return None
+
+    def _leaves(self, msg: Msg | MsgContent) -> list[_MsgLeafContent]:
         data = msg.content if isinstance(msg, Msg) else msg
-        if isinstance(data, _MsgLeafContent):
-            data = [data]
+        if isinstance(data, (str, bytes)) or _is_image(data) or _is_encoded_image(data):
+            return [data]
+        return list(data)
 
+    def _to_openai_msg(
+        self, msg: Msg | MsgContent, *, encoded: dict[int, bytes] = {}
+    ) -> dict:
         chunks = []
-        for d in data:
+        for d in self._leaves(msg):
             if isinstance(d, str):
                 chunks.append(d)
-            elif isinstance(d, Image.Image):
-                buff = io.BytesIO()
-                d.save(buff, format="PNG")
-                chunks.append(buff.getvalue())
+            elif (img := self._image_to_encode(d)) is not None:
+                b = encoded.get(id(d)) or encode_image(img, self._images)
+                if mx.recorder:
+                    mx.recorder.count("OpenaiAPI.image_bytes", len(b))
+                chunks.append(b)
+            elif _is_encoded_image(d):
+                if mx.recorder:
+                    mx.recorder.count("OpenaiAPI.image_bytes", len(d.data))
+                chunks.append(d.data)
             elif isinstance(d, bytes) and bool(imghdr.what(None, d)):
                 chunks.append(d)
             else:
@@ -198,45 +915,108 @@ class OpenaiAPI(Backend):
 
         return msglm.mk_msg(chunks, role=role, api="openai")
 
-# %% ../nbs/03_llms.ipynb 28
+# %% ../nbs/03_llms.ipynb 61
+class HistoryStore(abc.ABC):
+    """Persists the chat histories of sessions. See `history` for the implementations."""
+
+    @abc.abstractmethod
+    async def append(self, session: str, msgs: Sequence[Msg]):
+        """Appends messages to the history of a session."""
+
+    @abc.abstractmethod
+    async def load(self, session: str, *, last: int | None = None) -> list[Msg]:
+        """Returns the history of a session.
+
+        Args:
+          session: The session id.
+          last: Optional. If set, only the `last` messages are returned.
+        """
+
+# %% ../nbs/03_llms.ipynb 62
 class Chat(tx.Transform[MsgLike, MsgChunk]):
+    """A chat session over a backend.
+
+    Args:
+      backend: The backend of the chat.
+      history: The messages preceding the session, e.g. instructions. They are
+        not persisted.
+      name: Optional name to the chat assistant.
+      store: Optional. Persists the turns of the session. The stored history is
+        loaded on the first turn, and each completed turn is appended in the background.
+      session: The id of the session in the store.
+      max_turns: Optional. The maximum number of stored turns to load.
+      timeout_s: Optional. The latency budget of each turn. Turns exceeding it
+        are cut and not recorded in the history. See `sx.deadline`.
+    """
 
     def __init__(
         self,
         backend: Backend,
-        history: Sequence[MsgLike] = [],  # TODO: Add possibility to load from DB.
+        history: Sequence[MsgLike] = [],
         name: str = "",
+        *,
+        store: HistoryStore | None = None,
+        session: str = "",
+        max_turns: int | None = None,
+        timeout_s: float | None = None,
     ):
         # TODO: Add configuration for the temperature.
         # TODO: Add possibility to send full Msg not just chunks.
         self._backend = backend
         self._history = list(history)
         self._name = name
+        self._store = store
+        self._session = session
+        self._max_turns = max_turns
+        self._timeout_s = timeout_s
+        self._loaded = store is None
+        self._load_lock = asyncio.Lock()
+        self._bg_tasks = set()
 
     def __call__(self, chan: cx.Channel[MsgLike]) -> cx.Channel[MsgChunk]:
-        p = tx.CancelPrev() | self.chat
+        p = tx.CancelPrev() | tx.ParDo(self.chat, timeout_s=self._timeout_s)
         return p(chan)
 
     async def chat(self, msg: MsgLike):
         if not isinstance(msg, Msg):
             msg = Msg(role="user", content=msg)
+        await self._load()
 
         resp = ""
-        async for chunk in self._backend.chat.stream(
-            self._history + [msg],
-            name=self._name,
-        ):
-            resp = self._merge_content(new=chunk.content, prev=resp)
-            yield chunk
+        # Closing the stream cancels the backend call, e.g. when the turn is
+        # interrupted by the next message.
+        async with contextlib.aclosing(
+            self._backend.chat.stream(
+                self._history + [msg],
+                name=self._name,
+            )
+        ) as chunks:
+            async for chunk in chunks:
+                resp = self._merge_content(new=chunk.content, prev=resp)
+                yield chunk
 
         # Only record the history if the chat completion ends because
         # chats can be interrupted mid turns.
-        self._history.extend(
-            (
-                msg,
-                Msg(role="assistant", content=resp, name=self._name),
-            )
-        )
+        turn = (msg, Msg(role="assistant", content=resp, name=self._name))
+        self._history.extend(turn)
+        if self._store:
+            t = asyncio.create_task(self._store.append(self._session, turn))
+            self._bg_tasks.add(t)
+            t.add_done_callback(tx._print_task_errors)
+            t.add_done_callback(self._bg_tasks.discard)
+
+    async def flush(self):
+        """Waits for the completed turns to be stored."""
+        while self._bg_tasks:
+            await asyncio.wait(list(self._bg_tasks))
+
+    async def _load(self):
+        async with self._load_lock:
+            if self._loaded:
+                return
+            last = None if self._max_turns is None else 2 * self._max_turns
+            self._history.extend(await self._store.load(self._session, last=last))
+            self._loaded = True
 
     def _merge_content(
         self,
@@ -249,3 +1029,314 @@ class Chat(tx.Transform[MsgLike, MsgChunk]):
             new, (str, bytes)
         ), f"Cannot merge {prev} with type {type(prev)}"
         return prev + new
+
+# %% ../nbs/03_llms.ipynb 72
+@dataclass(frozen=True)
+class JsonEvent:
+    """A value of a JSON document.
+
+    Attributes:
+      path: The keys and indices leading to the value. Empty for the document.
+      value: The value. The containers are the ones of the document.
+      done: Whether the value is complete. Partial documents are still being filled.
+    """
+
+    path: tuple[str | int, ...]
+    value: Any
+    done: bool = True
+
+# %% ../nbs/03_llms.ipynb 73
+_JSON_WS = " \t\n\r"
+_JSON_SCALAR_START = "-0123456789tfn"
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+_JSON_SCALAR_END = re.compile(r"[ \t\n\r,\]}]")
+
+# The states of the parser, i.e. what it expects next.
+_VALUE, _FIRST_ITEM, _FIRST_KEY, _KEY, _COLON, _NEXT, _END = range(7)
+# The states inside a token.
+_STRING, _KEY_STRING, _SCALAR = range(7, 10)
+
+# %% ../nbs/03_llms.ipynb 74
+class JsonParser:
+    """Parses a JSON document fed in pieces, e.g. the chunks of a chat response.
+
+    Each piece is scanned once, so parsing a document is linear in its length.
+    The document is filled as its values complete, and `value` holds it at all times.
+
+    Args:
+      max_depth: Optional. Only reports the values nested at most `max_depth`
+        levels deep, e.g. 1 for the document and its fields.
+    """
+
+    def __init__(self, *, max_depth: int | None = None):
+        self._max_depth = max_depth
+        self.value = None
+        self.done = False
+        self._state = _VALUE
+        # The open containers, with the key (or index) of their value being parsed.
+        self._stack: list[list] = []
+        # The pieces of the string or scalar being parsed.
+        self._token: list[str] = []
+        # Whether the last piece ends with a backslash.
+        self._escaped = False
+        self._offset = 0
+        self._events: list[JsonEvent] = []
+
+    def feed(self, text: str) -> list[JsonEvent]:
+        """Parses the next piece of the document, and returns the values it completed."""
+        i, n = 0, len(text)
+        while i < n:
+            state = self._state
+            if state in (_STRING, _KEY_STRING):
+                i = self._scan_string(text, i)
+                continue
+            if state == _SCALAR:
+                m = _JSON_SCALAR_END.search(text, i)
+                j = m.start() if m else n
+                self._token.append(text[i:j])
+                if m:
+                    self._end_scalar()
+                i = j
+                continue
+
+            c = text[i]
+            if c in _JSON_WS:
+                pass
+            elif state == _VALUE or state == _FIRST_ITEM and c != "]":
+                if c == "{":
+                    self._add({})
+                elif c == "[":
+                    self._add([])
+                elif c == '"':
+                    self._state = _STRING
+                elif c in _JSON_SCALAR_START:
+                    # The scalar is scanned from its first character.
+                    self._state = _SCALAR
+                    continue
+                else:
+                    raise self._error(c, i)
+            elif state in (_FIRST_KEY, _KEY) and c == '"':
+                self._state = _KEY_STRING
+            elif state == _COLON and c == ":":
+                self._state = _VALUE
+            elif state == _NEXT and c == ",":
+                self._state = _KEY if isinstance(self._stack[-1][0], dict) else _VALUE
+            elif (
+                state == _FIRST_ITEM
+                and c == "]"
+                or state == _FIRST_KEY
+                and c == "}"
+                or state == _NEXT
+                and c == ("}" if isinstance(self._stack[-1][0], dict) else "]")
+            ):
+                container, _ = self._stack.pop()
+                self._complete(container)
+            else:
+                raise self._error(c, i)
+            i += 1
+
+        self._offset += n
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> list[JsonEvent]:
+        """Ends the document, and returns the values it completed.
+
+        Raises:
+          ValueError: If the document is incomplete.
+        """
+        if self._state == _SCALAR:
+            self._end_scalar()
+        if not self.done:
+            raise ValueError(
+                f"Incomplete JSON document after {self._offset} characters."
+            )
+        events, self._events = self._events, []
+        return events
+
+    def _scan_string(self, text: str, i: int) -> int:
+        """Scans the string from `text[i]` and returns where it stops."""
+        if self._escaped:
+            self._token.append(text[i])
+            self._escaped = False
+            i += 1
+        while m := _JSON_STRING_SPECIAL.search(text, i):
+            j = m.start()
+            if text[j] == '"':
+                self._token.append(text[i:j])
+                self._end_string()
+                return j + 1
+            # Skips the escaped character, which may be in the next piece.
+            self._token.append(text[i : j + 2])
+            if j + 1 == len(text):
+                self._escaped = True
+            i = j + 2
+        self._token.append(text[i:])
+        return len(text)
+
+    def _end_string(self):
+        s = json.loads('"' + "".join(self._token) + '"')
+        self._token.clear()
+        if self._state == _KEY_STRING:
+            self._stack[-1][1] = s
+            self._state = _COLON
+        else:
+            self._add(s)
+
+    def _end_scalar(self):
+        token = "".join(self._token)
+        self._token.clear()
+        try:
+            value = json.loads(token)
+        except ValueError:
+            raise ValueError(
+                f"Invalid JSON value {token!r} before offset {self._offset}."
+            ) from None
+        self._add(value)
+
+    def _add(self, value: Any):
+        """Adds a value to the document, and opens it if it's a container."""
+        if not self._stack:
+            self.value = value
+        elif isinstance(container := self._stack[-1][0], dict):
+            container[self._stack[-1][1]] = value
+        else:
+            self._stack[-1][1] = len(container)
+            container.append(value)
+
+        if isinstance(value, dict):
+            self._stack.append([value, None])
+            self._state = _FIRST_KEY
+        elif isinstance(value, list):
+            self._stack.append([value, None])
+            self._state = _FIRST_ITEM
+        else:
+            self._complete(value)
+
+    def _complete(self, value: Any):
+        if self._max_depth is None or len(self._stack) <= self._max_depth:
+            self._events.append(
+                JsonEvent(path=tuple(key for _, key in self._stack), value=value)
+            )
+        if self._stack:
+            self._state = _NEXT
+        else:
+            self._state = _END
+            self.done = True
+
+    def _error(self, c: str, i: int) -> ValueError:
+        return ValueError(f"Unexpected character {c!r} at offset {self._offset + i}.")
+
+# %% ../nbs/03_llms.ipynb 78
+class ParseJson(tx.Transform[MsgChunk, JsonEvent]):
+    """Parses the JSON responses of a chat as they're streamed.
+
+    Emits the values of each response as soon as they're complete, so the next stages
+    can start before the end of the generation. The responses are told apart by the
+    packets they derive from, and end with a chunk marked `end`. The responses
+    interrupted by a cancellation are dropped, and so is the rest of an invalid
+    response, without stopping the parsing of the other ones.
+
+    Args:
+      max_depth: Optional. The depth of the emitted values, e.g. 1 for the responses
+        and their fields. None emits all the values.
+      partial: Whether to also emit the partial response after each chunk, as an event
+        that isn't done. It's the document being filled, not a copy.
+      name: The name of the stage in the metrics.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_depth: int | None = 1,
+        partial: bool = False,
+        name: str = "ParseJson",
+    ):
+        self._max_depth = max_depth
+        self._partial = partial
+        self._name = name
+
+    def __call__(self, chan: cx.Channel[MsgChunk]) -> cx.Channel[JsonEvent]:
+        writer = sx.InMemStreamWriter(name=f"{self._name}.main")
+
+        async def proc(chan):
+            # The parsers of the responses, by the packets they derive from. None for the invalid ones.
+            parsers: dict[str | None, tuple[JsonParser | None, Sequence[str]]] = {}
+            try:
+                async for p in chan:
+                    assert isinstance(p, cx.Packet)
+                    if p.packet_type != cx.PacketType.DATA:
+                        await writer.put(p)
+                        if p.packet_type == cx.PacketType.CANCELLATION_PACKET:
+                            for k in [
+                                k
+                                for k, (_, tags) in parsers.items()
+                                if p.payload in tags
+                            ]:
+                                del parsers[k]
+                        continue
+
+                    chunk = p.payload
+                    if p.parent_packet_id not in parsers:
+                        parsers[p.parent_packet_id] = (
+                            JsonParser(max_depth=self._max_depth),
+                            p.tags,
+                        )
+                    parser, tags = parsers[p.parent_packet_id]
+                    events = []
+                    if parser:
+                        try:
+                            events = parser.feed(chunk.content)
+                            if chunk.end:
+                                events.extend(parser.close())
+                        except ValueError:
+                            if mx.recorder:
+                                mx.recorder.count(f"{self._name}.errors")
+                            parser = None
+                            parsers[p.parent_packet_id] = (None, tags)
+                    if chunk.end:
+                        del parsers[p.parent_packet_id]
+                    elif (
+                        self._partial
+                        and parser
+                        and isinstance(parser.value, (dict, list))
+                    ):
+                        events.append(
+                            JsonEvent(path=(), value=parser.value, done=False)
+                        )
+
+                    if mx.recorder:
+                        mx.recorder.count(f"{self._name}.events", len(events))
+                    for e in events:
+                        await writer.put(
+                            cx.Packet(
+                                payload=e,
+                                packet_type=cx.PacketType.DATA,
+                                parent_packet_id=p.packet_id,
+                                tags=p.tags,
+                            )
+                        )
+            finally:
+                await writer.shutdown()
+
+        asyncio.create_task(proc(chan)).add_done_callback(tx._print_task_errors)
+
+        return cx.as_chan(writer.readonly(), name=self._name)
+
+# %% ../nbs/03_llms.ipynb 83
+class Embed(tx.Transform[str, "np.ndarray"]):
+    """Embeds the texts of a channel.
+
+    The packets are embedded concurrently, so the backend merges them into batched requests.
+    """
+
+    def __init__(self, backend: Backend):
+        self._backend = backend
+
+    def __call__(self, chan: cx.Channel[str]) -> cx.Channel[np.ndarray]:
+        return tx.ParDo(self.embed)(chan)
+
+    async def embed(self, text: str):
+        # Yield the embedding: a returned array would be streamed element by element.
+        [vec] = await self._backend.embed([text])
+        yield vec
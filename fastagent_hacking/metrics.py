@@ -0,0 +1,165 @@
+"""Opt-in metrics and tracing of pipelines."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/11_metrics.ipynb.
+
+# %% auto 0
+__all__ = ['recorder', 'Histogram', 'Span', 'Recorder', 'recording']
+
+# %% ../nbs/11_metrics.ipynb 3
+import bisect
+import collections
+import contextlib
+import dataclasses
+import time
+import uuid
+from typing import Any, Iterator
+
+# %% ../nbs/11_metrics.ipynb 8
+# The bounds of the histogram buckets, from 1µs to ~2min.
+_BOUNDS = [1e-6 * 2**i for i in range(28)]
+
+
+@dataclasses.dataclass
+class Histogram:
+    """A summary of observed values, e.g. latencies in seconds."""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+    buckets: list[int] = dataclasses.field(
+        default_factory=lambda: [0] * (len(_BOUNDS) + 1)
+    )
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.buckets[bisect.bisect_left(_BOUNDS, value)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
+
+    def percentile(self, q: float) -> float:
+        """Returns an upper bound of the `q`-th percentile (0 <= q <= 100)."""
+        if not self.count:
+            return float("nan")
+        rank = max(q / 100 * self.count, 1)
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(_BOUNDS[i] if i < len(_BOUNDS) else self.max, self.max)
+
+# %% ../nbs/11_metrics.ipynb 10
+@dataclasses.dataclass
+class Span:
+    """An OpenTelemetry-style span.
+
+    Attributes:
+      name: The name of the operation, e.g. a pipeline stage.
+      span_id: The id of the span. The spans of the stages are identified by the
+        id of the packet they process.
+      parent_id: The id of the causing span. For stages, it's the
+        `parent_packet_id` of the processed packet.
+      start_time: The start time in seconds since the epoch.
+      end_time: The end time in seconds since the epoch, or None if not ended.
+      attributes: The properties of the operation.
+    """
+
+    name: str
+    span_id: str
+    parent_id: str | None
+    start_time: float
+    end_time: float | None = None
+    attributes: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    def to_otel(self) -> dict:
+        """Returns the span in the layout of the OpenTelemetry JSON exporter."""
+        return {
+            "name": self.name,
+            "context": {"span_id": self.span_id},
+            "parent_id": self.parent_id,
+            "start_time_unix_nano": int(self.start_time * 1e9),
+            "end_time_unix_nano": (
+                None if self.end_time is None else int(self.end_time * 1e9)
+            ),
+            "attributes": dict(self.attributes),
+        }
+
+# %% ../nbs/11_metrics.ipynb 11
+class Recorder:
+    """Collects the metrics and spans of the pipelines.
+
+    Metrics are named `{stage}.{metric}`. Counters are summed, high-water marks
+    keep the maximum observed value, and histograms summarize the distribution.
+
+    Args:
+      max_spans: The number of spans to keep. The oldest are dropped first.
+    """
+
+    def __init__(self, *, max_spans: int = 10_000):
+        self.counters = collections.Counter()
+        self.high_water = collections.Counter()
+        self.histograms = collections.defaultdict(Histogram)
+        self.spans = collections.deque(maxlen=max_spans)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def high_water_mark(self, name: str, value: int):
+        if value > self.high_water[name]:
+            self.high_water[name] = value
+
+    def observe(self, name: str, value: float):
+        self.histograms[name].observe(value)
+
+    def start_span(
+        self, name: str, *, span_id: str | None = None, parent_id: str | None = None
+    ) -> Span:
+        span = Span(
+            name=name,
+            span_id=span_id or uuid.uuid4().hex,
+            parent_id=parent_id,
+            start_time=time.time(),
+        )
+        self.spans.append(span)
+        return span
+
+    def end_span(self, span: Span, **attributes):
+        span.end_time = time.time()
+        span.attributes.update(attributes)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Returns the metrics as plain values, e.g. to export them."""
+        return {
+            "counters": dict(self.counters),
+            "high_water": dict(self.high_water),
+            "histograms": {
+                k: {
+                    "count": h.count,
+                    "mean": h.mean,
+                    "p50": h.percentile(50),
+                    "p99": h.percentile(99),
+                    "max": h.max,
+                }
+                for k, h in self.histograms.items()
+            },
+        }
+
+
+# The active recorder. None disables the instrumentation.
+recorder: Recorder | None = None
+
+
+@contextlib.contextmanager
+def recording(rec: Recorder | None = None) -> Iterator[Recorder]:
+    """Activates a recorder (a new one by default) within the context."""
+    global recorder
+    prev, recorder = recorder, rec or Recorder()
+    try:
+        yield recorder
+    finally:
+        recorder = prev
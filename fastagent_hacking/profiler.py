@@ -0,0 +1,140 @@
+"""Finds the stages that block the event loop."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/12_profiler.ipynb.
+
+# %% auto 0
+__all__ = ['profiler', 'StageProfile', 'Profiler', 'profiling']
+
+# %% ../nbs/12_profiler.ipynb 3
+import collections
+import contextlib
+import dataclasses
+import time
+from typing import Any, Callable, Coroutine, Iterator
+
+# %% ../nbs/12_profiler.ipynb 8
+@dataclasses.dataclass
+class StageProfile:
+    """The time a stage held the event loop.
+
+    Attributes:
+      steps: The number of steps, i.e. calls or resumptions between two awaits.
+      total_s: The total duration of the steps.
+      max_s: The duration of the longest step.
+      slow_steps: The number of steps longer than the threshold of the profiler.
+      handoffs: The number of items handed off to the next stage.
+      handoff_s: The total time spent handing off items.
+    """
+
+    steps: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    slow_steps: int = 0
+    handoffs: int = 0
+    handoff_s: float = 0.0
+
+# %% ../nbs/12_profiler.ipynb 9
+class _Timed:
+    """Runs a coroutine and times each of its steps."""
+
+    def __init__(self, prof: "Profiler", stage: str, coro: Coroutine):
+        self._prof = prof
+        self._stage = stage
+        self._coro = coro
+
+    def __await__(self):
+        value, exc = None, None
+        while True:
+            start = time.perf_counter()
+            try:
+                if exc is None:
+                    fut = self._coro.send(value)
+                else:
+                    fut = self._coro.throw(exc)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self._prof.record(self._stage, time.perf_counter() - start)
+
+            try:
+                value, exc = (yield fut), None
+            except GeneratorExit:
+                self._coro.close()
+                raise
+            except BaseException as e:
+                value, exc = None, e
+
+# %% ../nbs/12_profiler.ipynb 10
+class Profiler:
+    """Times the steps of the stages on the event loop, and flags the slow ones.
+
+    Args:
+      threshold_s: The duration above which a step is considered blocking.
+      max_slow: The number of slow steps to keep. The oldest are dropped first.
+    """
+
+    def __init__(self, *, threshold_s: float = 0.01, max_slow: int = 1000):
+        self.threshold_s = threshold_s
+        self.stages = collections.defaultdict(StageProfile)
+        # The (stage, duration) of the slow steps.
+        self.slow = collections.deque(maxlen=max_slow)
+
+    def record(self, stage: str, duration_s: float):
+        """Records a step of `stage`."""
+        p = self.stages[stage]
+        p.steps += 1
+        p.total_s += duration_s
+        p.max_s = max(p.max_s, duration_s)
+        if duration_s > self.threshold_s:
+            p.slow_steps += 1
+            self.slow.append((stage, duration_s))
+
+    def record_handoff(self, stage: str, duration_s: float):
+        """Records the handoff of an item from `stage` to the next one."""
+        p = self.stages[stage]
+        p.handoffs += 1
+        p.handoff_s += duration_s
+
+    async def timed(self, stage: str, coro: Coroutine) -> Any:
+        """Runs `coro` and records its steps."""
+        return await _Timed(self, stage, coro)
+
+    def timed_call(self, stage: str, fn: Callable, *args, **kwargs) -> Any:
+        """Calls the sync function `fn` and records the call as a step."""
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def report(self, top: int = 10) -> str:
+        """Returns a table of the `top` stages holding the event loop the longest."""
+        rows = sorted(self.stages.items(), key=lambda kv: kv[1].max_s, reverse=True)[
+            :top
+        ]
+        lines = [
+            f"{'stage':<40} {'steps':>8} {'total':>10} {'max':>10} {'slow':>6} {'handoffs':>9}"
+        ]
+        for stage, p in rows:
+            lines.append(
+                f"{stage[:40]:<40} {p.steps:>8} {p.total_s * 1e3:>8.1f}ms {p.max_s * 1e3:>8.1f}ms "
+                f"{p.slow_steps:>6} {p.handoffs:>9}"
+            )
+        return "\n".join(lines)
+
+
+# The active profiler. None disables the profiling.
+profiler: Profiler | None = None
+
+
+@contextlib.contextmanager
+def profiling(
+    prof: Profiler | None = None, *, threshold_s: float = 0.01
+) -> Iterator[Profiler]:
+    """Activates a profiler (a new one by default) within the context."""
+    global profiler
+    prev, profiler = profiler, prof or Profiler(threshold_s=threshold_s)
+    try:
+        yield profiler
+    finally:
+        profiler = prev
@@ -0,0 +1,292 @@
+"""Client-side rate limiting for LLM backends."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/05_ratelimit.ipynb.
+
+# %% auto 0
+__all__ = ['Priority', 'LimiterStats', 'RateLimiter', 'RateLimitedBackend']
+
+# %% ../nbs/05_ratelimit.ipynb 3
+import asyncio
+import bisect
+import collections
+import contextlib
+import dataclasses
+import enum
+import itertools
+import time
+from typing import AsyncIterator, Sequence
+
+import fastagent_hacking.transforms as tx
+import fastagent_hacking.llms as lx
+
+# %% ../nbs/05_ratelimit.ipynb 8
+class _TokenBucket:
+    """Refills at `per_min / 60` units per second up to `per_min * burst` units.
+
+    The level can go negative when more units are taken than available. The debt
+    is then paid back before the next units are handed out.
+    """
+
+    def __init__(self, per_min: float, burst: float = 1.0):
+        self._rate = per_min / 60
+        self._capacity = max(per_min * burst, 1)
+        self._level = self._capacity
+        self._t = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self._capacity, self._level + (now - self._t) * self._rate)
+        self._t = now
+
+    def delay(self, n: float) -> float:
+        """Returns the number of seconds until `n` units are available."""
+        self._refill()
+        # Requests larger than the capacity wait for a full bucket.
+        n = min(n, self._capacity)
+        return max(0.0, (n - self._level) / self._rate)
+
+    def take(self, n: float):
+        self._refill()
+        self._level -= n
+
+# %% ../nbs/05_ratelimit.ipynb 11
+class Priority(enum.IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+@dataclasses.dataclass(order=True)
+class _Waiter:
+    priority: Priority
+    seq: int
+    model: str = dataclasses.field(compare=False)
+    tokens: int = dataclasses.field(compare=False)
+    granted: asyncio.Future = dataclasses.field(compare=False)
+
+
+@dataclasses.dataclass(frozen=True)
+class LimiterStats:
+    """A snapshot of the limiter activity.
+
+    Attributes:
+      granted: The number of requests let through so far.
+      queued: The number of requests currently waiting.
+      in_flight: The number of requests currently running.
+      total_wait_s: The total time spent waiting in the queue, in seconds.
+      max_wait_s: The longest time a request waited in the queue, in seconds.
+    """
+
+    granted: int
+    queued: int
+    in_flight: int
+    total_wait_s: float
+    max_wait_s: float
+
+    @property
+    def mean_wait_s(self) -> float:
+        return self.total_wait_s / self.granted if self.granted else 0.0
+
+# %% ../nbs/05_ratelimit.ipynb 12
+class RateLimiter:
+    """Throttles requests to stay below the provider quotas.
+
+    Args:
+      requests_per_min: Optional. The maximum number of requests per minute.
+      tokens_per_min: Optional. The maximum number of tokens per minute.
+      max_concurrency: Optional. The maximum number of in-flight requests per model.
+      burst: The fraction of the per-minute quotas that can be used at once.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_min: float | None = None,
+        tokens_per_min: float | None = None,
+        max_concurrency: int | None = None,
+        burst: float = 1.0,
+    ):
+        self._buckets = {}
+        if requests_per_min:
+            self._buckets["requests"] = _TokenBucket(requests_per_min, burst)
+        if tokens_per_min:
+            self._buckets["tokens"] = _TokenBucket(tokens_per_min, burst)
+        self._max_concurrency = max_concurrency
+
+        self._in_flight = collections.Counter()
+        self._waiters = []  # Sorted by (priority, arrival).
+        self._seq = itertools.count()
+        self._timer = None
+
+        self._granted = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self,
+        *,
+        model: str = "",
+        tokens: int = 0,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[float]:
+        """Waits for a slot and holds it until the context exits.
+
+        Args:
+          model: The concurrency limit applies to each model separately.
+          tokens: The estimated number of tokens of the request.
+          priority: Requests with a lower priority value are served first.
+
+        Yields:
+          The time spent waiting in the queue, in seconds.
+        """
+        w = _Waiter(
+            priority=priority,
+            seq=next(self._seq),
+            model=model,
+            tokens=tokens,
+            granted=asyncio.get_running_loop().create_future(),
+        )
+        bisect.insort(self._waiters, w)
+        start = time.monotonic()
+        self._dispatch()
+
+        try:
+            await w.granted
+        except asyncio.CancelledError:
+            if w.granted.done() and not w.granted.cancelled():
+                # The slot was granted right before the cancellation.
+                self._release(model)
+            else:
+                self._dispatch()
+            raise
+
+        wait = time.monotonic() - start
+        self._granted += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        try:
+            yield wait
+        finally:
+            self._release(model)
+
+    def debit(self, tokens: int):
+        """Charges `tokens` that weren't accounted for when acquiring a slot."""
+        if b := self._buckets.get("tokens"):
+            b.take(tokens)
+
+    def stats(self) -> LimiterStats:
+        return LimiterStats(
+            granted=self._granted,
+            queued=sum(not w.granted.done() for w in self._waiters),
+            in_flight=sum(self._in_flight.values()),
+            total_wait_s=self._total_wait,
+            max_wait_s=self._max_wait,
+        )
+
+    def _release(self, model: str):
+        self._in_flight[model] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grants slots to the waiters in priority order."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        blocked = []
+        for i, w in enumerate(self._waiters):
+            if w.granted.done():
+                continue  # Cancelled.
+
+            if (
+                self._max_concurrency
+                and self._in_flight[w.model] >= self._max_concurrency
+            ):
+                # Other models may still have free slots.
+                blocked.append(w)
+                continue
+
+            units = {"requests": 1, "tokens": w.tokens}
+            delay = max(
+                (b.delay(units[k]) for k, b in self._buckets.items()), default=0
+            )
+            if delay > 0:
+                # The quotas are shared, so lower priority waiters can't skip ahead.
+                blocked.extend(self._waiters[i:])
+                self._timer = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                break
+
+            for k, b in self._buckets.items():
+                b.take(units[k])
+            self._in_flight[w.model] += 1
+            w.granted.set_result(None)
+
+        self._waiters = blocked
+
+# %% ../nbs/05_ratelimit.ipynb 21
+def _estimate_tokens(msgs: Sequence[lx.MsgLike]) -> int:
+    """Roughly estimates the number of tokens of `msgs` (~4 characters per token)."""
+
+    def count(content) -> int:
+        if isinstance(content, str):
+            return len(content) // 4 + 1
+        elif isinstance(content, (list, tuple)):
+            return sum(count(c) for c in content)
+        # Images: The cost of a high resolution image tile.
+        return 765
+
+    return sum(count(m.content if isinstance(m, lx.Msg) else m) for m in msgs)
+
+# %% ../nbs/05_ratelimit.ipynb 23
+class RateLimitedBackend(lx.Backend):
+    """Backend decorator that waits for a `RateLimiter` slot before each request.
+
+    The limiter can be shared by many backends. For example, an interactive
+    and a batch backend that draw from the same provider quota.
+
+    Args:
+      backend: The backend to rate limit.
+      limiter: The limiter to acquire the slots from.
+      priority: The priority lane of the requests.
+      model: The model used for the concurrency limits. Defaults to
+        `backend.model` if it exists.
+    """
+
+    def __init__(
+        self,
+        backend: lx.Backend,
+        limiter: RateLimiter,
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        model: str | None = None,
+    ):
+        self._backend = backend
+        self._limiter = limiter
+        self._priority = priority
+        self._model = model if model is not None else getattr(backend, "model", "")
+
+    @tx.tfn
+    async def chat(
+        self,
+        msgs: Sequence[lx.MsgLike],
+        *,
+        name: str = "",
+        temperature: float | None = None,
+        sink=None,
+    ) -> lx.Msg:
+        async with self._limiter.acquire(
+            model=self._model,
+            tokens=_estimate_tokens(msgs),
+            priority=self._priority,
+        ):
+            msg = await self._backend.chat(
+                msgs,
+                name=name,
+                temperature=temperature,
+                sink=sink,
+            )
+        # The completion tokens are only known once the response is done.
+        self._limiter.debit(_estimate_tokens([msg]))
+        return msg
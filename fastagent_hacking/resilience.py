@@ -0,0 +1,176 @@
+"""Retries, hedging and failover for LLM backends."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/06_resilience.ipynb.
+
+# %% auto 0
+__all__ = ['ResilientBackend']
+
+# %% ../nbs/06_resilience.ipynb 3
+import asyncio
+import collections
+import functools
+import random
+from typing import Sequence
+
+import fastagent_hacking.streams as sx
+import fastagent_hacking.transforms as tx
+import fastagent_hacking.llms as lx
+
+# %% ../nbs/06_resilience.ipynb 8
+class _Candidate(sx.Sink[lx.MsgChunk]):
+    """One of the racing requests. Buffers its chunks until it's promoted."""
+
+    def __init__(self, call):
+        self._buffer = []
+        self._sink = None
+        self.first_chunk = asyncio.get_running_loop().create_future()
+        self.task = asyncio.create_task(call(sink=self))
+
+    async def put(self, *items: lx.MsgChunk):
+        if not self.first_chunk.done():
+            self.first_chunk.set_result(None)
+        if self._sink:
+            await self._sink.put(*items)
+        else:
+            self._buffer.extend(items)
+
+    async def promote(self, sink: sx.Sink):
+        """Flushes the buffered chunks to `sink` and forwards the next ones to it."""
+        while self._buffer:
+            # More chunks can be buffered while flushing.
+            items, self._buffer = self._buffer, []
+            await sink.put(*items)
+        self._sink = sink
+
+
+class _Forwarder(sx.Sink[lx.MsgChunk]):
+    """Forwards chunks to the caller's sink and records whether any went through.
+
+    Once the caller has seen a chunk, a failed request can't be retried
+    without duplicating the output.
+    """
+
+    def __init__(self, sink: sx.Sink | None):
+        self._sink = sink
+        self.started = False
+
+    async def put(self, *items: lx.MsgChunk):
+        if self._sink:
+            self.started = True
+            await self._sink.put(*items)
+
+# %% ../nbs/06_resilience.ipynb 9
+async def _race(call, sink: sx.Sink, *, hedge_after_s: float | None) -> lx.Msg:
+    """Runs `call` and hedges it if it doesn't stream in time.
+
+    The first request to stream a chunk (or to return) wins and the other one is cancelled.
+    """
+    cands = [_Candidate(call)]
+    try:
+        winner = None
+        while winner is None:
+            can_hedge = hedge_after_s is not None and len(cands) == 1
+            done, _ = await asyncio.wait(
+                [c.first_chunk for c in cands] + [c.task for c in cands],
+                timeout=hedge_after_s if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                cands.append(_Candidate(call))
+                continue
+
+            for c in list(cands):
+                if c.first_chunk.done() or (c.task.done() and not c.task.exception()):
+                    winner = c
+                    break
+                if c.task.done():
+                    # Failed before streaming anything: the other candidate may still succeed.
+                    cands.remove(c)
+                    if not cands:
+                        raise c.task.exception()
+
+        for c in cands:
+            if c is not winner:
+                c.task.cancel()
+        await winner.promote(sink)
+        return await winner.task
+    finally:
+        for c in cands:
+            c.task.cancel()
+
+# %% ../nbs/06_resilience.ipynb 11
+class ResilientBackend(lx.Backend):
+    """Backend decorator that retries, hedges and fails over chat requests.
+
+    A request is only retried if it failed before any chunk reached the caller,
+    otherwise the caller would see duplicated chunks.
+
+    Args:
+      backend: The primary backend.
+      fallbacks: Backends (e.g. other providers or models) to fail over to, in order,
+        once the retries on the previous backend are exhausted.
+      max_attempts: The maximum number of attempts per backend.
+      backoff_s: The base delay between attempts. The delay doubles after each
+        attempt and is jittered uniformly between 0 and its value.
+      max_backoff_s: The maximum delay between attempts.
+      hedge_after_s: Optional. If no chunk is streamed within this delay,
+        a duplicate request is sent and the first one to stream wins.
+      retry_on: The exceptions that are worth retrying.
+    """
+
+    def __init__(
+        self,
+        backend: lx.Backend,
+        *,
+        fallbacks: Sequence[lx.Backend] = (),
+        max_attempts: int = 3,
+        backoff_s: float = 0.1,
+        max_backoff_s: float = 5.0,
+        hedge_after_s: float | None = None,
+        retry_on: tuple[type[Exception], ...] = (Exception,),
+    ):
+        assert max_attempts > 0, f"Expected a positive max_attempts, got {max_attempts}"
+        self._backends = [backend, *fallbacks]
+        self._max_attempts = max_attempts
+        self._backoff_s = backoff_s
+        self._max_backoff_s = max_backoff_s
+        self._hedge_after_s = hedge_after_s
+        self._retry_on = retry_on
+        self.stats = collections.Counter()
+
+    @tx.tfn
+    async def chat(
+        self,
+        msgs: Sequence[lx.MsgLike],
+        *,
+        name: str = "",
+        temperature: float | None = None,
+        sink=None,
+    ) -> lx.Msg:
+        fwd = _Forwarder(sink)
+        for i, backend in enumerate(self._backends):
+            if i:
+                self.stats["failovers"] += 1
+            for attempt in range(self._max_attempts):
+                if attempt:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self._backoff(attempt))
+
+                call = functools.partial(
+                    backend.chat,
+                    msgs,
+                    name=name,
+                    temperature=temperature,
+                )
+                try:
+                    return await _race(call, fwd, hedge_after_s=self._hedge_after_s)
+                except self._retry_on as e:
+                    if fwd.started:
+                        raise
+                    err = e
+        raise err
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(
+            0, min(self._max_backoff_s, self._backoff_s * 2 ** (attempt - 1))
+        )
@@ -3,28 +3,39 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_streams.ipynb.
 
 # %% auto 0
-__all__ = ['StreamStatus', 'Stream', 'StreamWriter', 'InMemStreamWriter', 'tolist', 'of', 'concat', 'interleave', 'mix',
-           'flatten', 'streamify', 'map', 'filter', 'zip', 'fork']
+__all__ = ['Executor', 'StreamStatus', 'Stream', 'deadline', 'cur_deadline', 'remaining', 'deadline_exceeded', 'until_deadline',
+           'Sink', 'StreamWriter', 'InMemStreamWriter', 'tolist', 'of', 'concat', 'interleave', 'mix', 'flatten',
+           'streamify', 'map', 'filter', 'zip', 'fork', 'take', 'take_until', 'timeout', 'race']
 
 # %% ../nbs/00_streams.ipynb 3
 import asyncio
 import functools
 import abc
 import collections
+import contextlib
+import contextvars
 import enum
+import time
+import concurrent.futures
+import inspect
+import multiprocessing
+import threading
 from typing import (
     Any,
     Sequence,
     AsyncIterable,
     AsyncIterator,
     Iterable,
+    Iterator,
+    Literal,
     TypeVar,
     Generic,
     Awaitable,
     Callable,
 )
 
-from fastcore.basics import patch
+import fastagent_hacking.metrics as mx
+import fastagent_hacking.profiler as px
 
 # %% ../nbs/00_streams.ipynb 7
 _T = TypeVar("T")
@@ -45,7 +56,12 @@ class Stream(abc.ABC, AsyncIterator[_T]):
         pass
 
     async def __anext__(self) -> _T:
-        e, status = await self.next(with_status=True)
+        if _deadline_ctxvar.get() is None:
+            e, status = await self.next(with_status=True)
+        else:
+            # Readers fail at the deadline. See `deadline`.
+            async with until_deadline():
+                e, status = await self.next(with_status=True)
         if status == StreamStatus.SHUTDOWN:
             raise StopAsyncIteration
         return e
@@ -53,13 +69,93 @@ class Stream(abc.ABC, AsyncIterator[_T]):
     def __aiter__(self) -> AsyncIterator[_T]:
         return self
 
+    async def aclose(self):
+        """Stops the stream, e.g. when the reader doesn't need more items.
+
+        Closing a stream cancels the tasks producing it and closes its upstream
+        streams, so their work stops. Closing a closed stream is a no-op.
+        """
+
+
+class _TaskStream(Stream[_T]):
+    """The output stream of a background task. Closing it cancels the task."""
+
+    def __init__(self, s: Stream[_T], task: asyncio.Task):
+        self._s = s
+        self._task = task
+
+    async def next(self, with_status: bool = False) -> _T | None:
+        return await self._s.next(with_status=with_status)
+
+    async def aclose(self):
+        """Cancels the task and waits for it to stop."""
+        if not self._task.done():
+            self._task.cancel()
+            await asyncio.wait([self._task])
+
+
+async def _aclose_all(streams: Iterable[Stream]):
+    await asyncio.gather(*(s.aclose() for s in streams))
+
 # %% ../nbs/00_streams.ipynb 9
-class StreamWriter(abc.ABC, Generic[_T]):
+_deadline_ctxvar = contextvars.ContextVar("_deadline_contextvar", default=None)
+
+
+@contextlib.contextmanager
+def deadline(timeout_s: float | None) -> Iterator[float | None]:
+    """Sets a deadline `timeout_s` from now within the context.
+
+    A nested deadline can only shorten the current one. If `timeout_s` is None,
+    the current deadline is kept.
+
+    Yields:
+      The deadline in `time.monotonic()` seconds, or None if there is none.
+    """
+    d = _deadline_ctxvar.get()
+    if timeout_s is not None:
+        d = min(d or float("inf"), time.monotonic() + timeout_s)
+    tok = _deadline_ctxvar.set(d)
+    try:
+        yield d
+    finally:
+        _deadline_ctxvar.reset(tok)
+
+
+def cur_deadline() -> float | None:
+    """Returns the current deadline in `time.monotonic()` seconds, if any."""
+    return _deadline_ctxvar.get()
+
+
+def remaining() -> float | None:
+    """Returns the seconds left before the current deadline (<= 0 if passed), if any."""
+    d = _deadline_ctxvar.get()
+    return None if d is None else d - time.monotonic()
+
+
+def deadline_exceeded() -> bool:
+    """Returns True if the current deadline passed."""
+    d = _deadline_ctxvar.get()
+    return d is not None and time.monotonic() >= d
+
+
+def until_deadline() -> asyncio.Timeout:
+    """Returns an `asyncio.timeout` expiring at the current deadline, if any."""
+    return asyncio.timeout(remaining())
+
+# %% ../nbs/00_streams.ipynb 12
+class Sink(abc.ABC, Generic[_T]):
+    """A write only destination of items."""
 
     @abc.abstractmethod
     async def put(self, *items: _T):
         pass
 
+    async def shutdown(self):
+        pass
+
+
+class StreamWriter(Sink[_T]):
+
     @abc.abstractmethod
     async def shutdown(self):
         pass
@@ -68,12 +164,21 @@ class StreamWriter(abc.ABC, Generic[_T]):
     def readonly(self) -> Stream[_T]:
         pass
 
-# %% ../nbs/00_streams.ipynb 10
+# %% ../nbs/00_streams.ipynb 13
 class InMemStreamWriter(StreamWriter[_T]):
+    """A stream writer backed by an in-memory queue.
 
-    def __init__(self):
-        self._q = asyncio.Queue()
+    Args:
+      name: The name of the writer in the metrics. See `metrics`.
+      maxsize: If positive, `put` waits while `maxsize` items are unread.
+    """
+
+    def __init__(self, *, name: str = "stream", maxsize: int = 0):
+        self._q = asyncio.Queue(maxsize)
         self._lock = asyncio.Lock()
+        self._name = name
+        self._created_at = time.perf_counter()
+        self._first_put = True
 
     async def put(self, *items: _T):
         async with self._lock:
@@ -83,6 +188,15 @@ class InMemStreamWriter(StreamWriter[_T]):
                     await self._q.put(item)
             except asyncio.QueueShutDown:
                 pass
+        if mx.recorder:
+            self._record_put(mx.recorder, len(items))
+
+    def _record_put(self, rec: mx.Recorder, n: int):
+        rec.count(f"{self._name}.items", n)
+        rec.high_water_mark(f"{self._name}.queue_depth", self._q.qsize())
+        if self._first_put:
+            self._first_put = False
+            rec.observe(f"{self._name}.ttfi_s", time.perf_counter() - self._created_at)
 
     async def shutdown(self):
         async with self._lock:
@@ -109,11 +223,11 @@ class InMemStreamWriter(StreamWriter[_T]):
 
         return _S()
 
-# %% ../nbs/00_streams.ipynb 17
+# %% ../nbs/00_streams.ipynb 21
 async def tolist(s: Stream[_T]) -> list[_T]:
     return [e async for e in s]
 
-# %% ../nbs/00_streams.ipynb 19
+# %% ../nbs/00_streams.ipynb 23
 def of(*args: _T | AsyncIterable[_T] | Iterable[_T]) -> Stream[_T]:
     """Returns a Stream from the given source(s)."""
 
@@ -139,6 +253,11 @@ def of(*args: _T | AsyncIterable[_T] | Iterable[_T]) -> Stream[_T]:
                 return item, status
             return item
 
+        async def aclose(self):
+            # e.g. async generators and streams.
+            if hasattr(self._iter, "aclose"):
+                await self._iter.aclose()
+
         async def _to_aiter(self, iterable: Iterable[_T]) -> AsyncIterator[_T]:
             for item in iterable:
                 # Simulate asynchronous behavior.
@@ -150,7 +269,7 @@ def of(*args: _T | AsyncIterable[_T] | Iterable[_T]) -> Stream[_T]:
 
     return _FromIterableStream(args)
 
-# %% ../nbs/00_streams.ipynb 25
+# %% ../nbs/00_streams.ipynb 29
 def concat(*streams: Stream[_T]) -> Stream[_T]:
     """Concatenates the given streams."""
 
@@ -179,59 +298,197 @@ def concat(*streams: Stream[_T]) -> Stream[_T]:
                 return None, StreamStatus.SHUTDOWN
             return None
 
+        async def aclose(self):
+            await _aclose_all(streams[self._idx :])
+
     return _ConcatStream()
 
-# %% ../nbs/00_streams.ipynb 26
-@patch
-def __add__(
+# %% ../nbs/00_streams.ipynb 30
+def _stream_add(
     self: Stream,
     other: Stream,
 ) -> Stream:
     return concat(self, other)
 
-# %% ../nbs/00_streams.ipynb 32
+
+Stream.__add__ = _stream_add
+
+# %% ../nbs/00_streams.ipynb 36
 def interleave(*streams: Stream[_T]) -> Stream[_T]:
     w = InMemStreamWriter()
 
     async def consume(s):
         nonlocal w
-        async for e in s:
-            await w.put(e)
+        try:
+            async for e in s:
+                await w.put(e)
+        except TimeoutError:
+            # Shuts down at the deadline. See `deadline`.
+            if not deadline_exceeded():
+                raise
+        finally:
+            await s.aclose()
 
     ts = [asyncio.create_task(consume(s)) for s in streams]
 
     async def cleanup():
         nonlocal ts
-        await asyncio.gather(*ts)
-        await w.shutdown()
+        try:
+            # Cancelling the gathering cancels the consumers.
+            await asyncio.gather(*ts)
+        finally:
+            await w.shutdown()
 
-    asyncio.create_task(cleanup())
+    return _TaskStream(w.readonly(), asyncio.create_task(cleanup()))
 
-    return w.readonly()
-
-# %% ../nbs/00_streams.ipynb 33
+# %% ../nbs/00_streams.ipynb 37
 def mix(*streams: Stream[_T]) -> Stream[_T]:
     return interleave(*streams)
 
-# %% ../nbs/00_streams.ipynb 37
+# %% ../nbs/00_streams.ipynb 42
 def flatten(s: Stream[_T | Stream[_T]]) -> Stream[_T]:
     """Flattens one level nested stream."""
 
     async def consume(s):
-        async for x in s:
-            if isinstance(x, Stream):
-                async for y in x:
-                    yield y
-            else:
-                yield x
+        try:
+            async for x in s:
+                if isinstance(x, Stream):
+                    async with contextlib.aclosing(x):
+                        async for y in x:
+                            yield y
+                else:
+                    yield x
+        finally:
+            await s.aclose()
 
     return of(consume(s))
 
-# %% ../nbs/00_streams.ipynb 42
+# %% ../nbs/00_streams.ipynb 48
+Executor = concurrent.futures.Executor | Literal["thread", "process", "auto"]
+
+# The max number of items produced by an offloaded generator, and not yet read.
+_HANDOFF_SIZE = 16
+
+_pools: dict[str, concurrent.futures.Executor] = {}
+
+
+def _resolve_executor(
+    executor: Executor | None, func: Callable
+) -> concurrent.futures.Executor | None:
+    """Returns the executor to run `func` in, or None to run it on the loop."""
+    if (
+        executor is None
+        or asyncio.iscoroutinefunction(func)
+        or inspect.isasyncgenfunction(func)
+    ):
+        return None
+    if isinstance(executor, concurrent.futures.Executor):
+        return executor
+    kind = "thread" if executor == "auto" else executor
+    if kind not in _pools:
+        if kind == "thread":
+            _pools[kind] = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="streamify"
+            )
+        elif kind == "process":
+            # Forking a process running threads, e.g. the thread pool, may deadlock.
+            ctx = multiprocessing.get_context("forkserver")
+            _pools[kind] = concurrent.futures.ProcessPoolExecutor(mp_context=ctx)
+        else:
+            raise ValueError(f"Unknown executor: {executor}")
+    return _pools[kind]
+
+
+def _call_in_process(func: Callable, args, kwargs) -> Any:
+    # Generators cannot be sent back to the parent process.
+    result = func(*args, **kwargs)
+    return list(result) if isinstance(result, Iterator) else result
+
+
+async def _offloaded(
+    ex: concurrent.futures.Executor, func: Callable, args, kwargs
+) -> AsyncIterator:
+    """Yields the output of `func` called in `ex`."""
+    loop = asyncio.get_running_loop()
+    if isinstance(ex, concurrent.futures.ProcessPoolExecutor):
+        result = await loop.run_in_executor(ex, _call_in_process, func, args, kwargs)
+        async for e in of(result):
+            yield e
+        return
+
+    # The thread calls `func` and iterates its output, so a generator holds a
+    # single worker, and the loop only receives the items.
+    q = asyncio.Queue()
+    slots = threading.Semaphore(_HANDOFF_SIZE)
+    stop = threading.Event()
+
+    def send(kind, value=None):
+        try:
+            loop.call_soon_threadsafe(q.put_nowait, (kind, value))
+        except RuntimeError:
+            pass  # The loop is closed.
+
+    def produce():
+        try:
+            result = func(*args, **kwargs)
+            if inspect.isawaitable(result) or isinstance(result, AsyncIterable):
+                send("value", result)
+                return
+            for e in result if isinstance(result, Iterable) else (result,):
+                slots.acquire()
+                if stop.is_set():
+                    if close := getattr(result, "close", None):
+                        close()
+                    return
+                send("item", e)
+            send("done")
+        except BaseException as e:
+            send("error", e)
+
+    loop.run_in_executor(ex, produce)
+    try:
+        while True:
+            kind, value = await q.get()
+            if kind == "item":
+                slots.release()
+                yield value
+            elif kind == "value":
+                if inspect.isawaitable(value):
+                    value = await value
+                async for e in of(value):
+                    yield e
+                return
+            elif kind == "error":
+                raise value
+            else:
+                return
+    finally:
+        # Unblocks the thread if it waits for a slot.
+        stop.set()
+        slots.release()
+
+# %% ../nbs/00_streams.ipynb 49
+async def _profiled(prof, stage: str, func: Callable, args, kwargs) -> AsyncIterator:
+    """Yields the output of `func`, recording the time it holds the loop to `prof`."""
+    if asyncio.iscoroutinefunction(func):
+        result = await prof.timed(stage, func(*args, **kwargs))
+    else:
+        result = prof.timed_call(stage, func, *args, **kwargs)
+    s = of(result)
+    while True:
+        try:
+            e = await prof.timed(stage, anext(s))
+        except StopAsyncIteration:
+            return
+        yield e
+
+
 def streamify(
     func: Callable,
     *,
     return_shutdown_fn: bool = False,
+    name: str | None = None,
+    executor: Executor | None = None,
 ) -> Callable:
     """Decorator to convert the output of a function to a stream.
 
@@ -242,26 +499,59 @@ def streamify(
       return_shutdown_fn: If True, calling the decorated function returns a tuple
         containing the stream and a function to close the stream generation. The
         shutdown function will try to cancel the decorated function if it's still running.
+      name: The name of the stage in the profiles, the function name by default.
+      executor: Optional. Where to run `func` if it's sync. See above. Note that
+        the shutdown function cannot interrupt a running call, but it stops
+        the iteration of generators.
+
+    The stream is shut down at the deadline of the calling context, if any.
+    See `deadline`. Closing the stream cancels the function.
     """
+    stage = name or getattr(func, "__qualname__", type(func).__qualname__)
+    ex = _resolve_executor(executor, func)
 
     @functools.wraps(func)
     def wrapper(
         *args,
         **kwargs,
     ) -> Stream[_T] | tuple[Stream[_T] | Callable[[], None]]:
-        sw = InMemStreamWriter()
+        # Offloaded generators are only advanced as their items are read.
+        sw = InMemStreamWriter(maxsize=_HANDOFF_SIZE if ex else 0)
 
         async def mk_stream():
             nonlocal sw
+            s = None
             try:
-                if asyncio.iscoroutinefunction(func):
-                    result = await func(*args, **kwargs)
-                else:
-                    result = func(*args, **kwargs)
-                s = of(result)  # Handles also async and sync iterables.
-                async for e in s:
-                    await sw.put(e)
+                async with until_deadline():
+                    prof = px.profiler
+                    if ex:
+                        s = _offloaded(ex, func, args, kwargs)
+                    elif prof:
+                        s = _profiled(prof, stage, func, args, kwargs)
+                    else:
+                        if asyncio.iscoroutinefunction(func):
+                            result = await func(*args, **kwargs)
+                        else:
+                            result = func(*args, **kwargs)
+                        s = of(result)  # Handles also async and sync iterables.
+
+                    async for e in s:
+                        if prof:
+                            start = time.perf_counter()
+                            await sw.put(e)
+                            prof.record_handoff(stage, time.perf_counter() - start)
+                        else:
+                            await sw.put(e)
+            except TimeoutError:
+                # Shuts down at the deadline. See `deadline`.
+                if not deadline_exceeded():
+                    raise
+                if mx.recorder:
+                    mx.recorder.count(f"{stage}.deadline_exceeded")
             finally:
+                if s is not None:
+                    # Stops the generators, e.g. the offloaded ones, whose thread waits for the reader.
+                    await s.aclose()
                 await sw.shutdown()
 
         # Write to the stream in the background.
@@ -270,14 +560,21 @@ def streamify(
         if return_shutdown_fn:
             # FIXME: Not sure but I think if the function is sync, the cancellation will not be immediate.
             #    If it's the case we may want to at least shutdown the stream soon.
-            return sw.readonly(), t.cancel
-        return sw.readonly()
+            return _TaskStream(sw.readonly(), t), t.cancel
+        return _TaskStream(sw.readonly(), t)
 
     return wrapper
 
-# %% ../nbs/00_streams.ipynb 51
-def map(func, *streams) -> Stream[_T]:
-    """Maps the given function over the given streams."""
+# %% ../nbs/00_streams.ipynb 63
+def map(func, *streams, executor: Executor | None = None) -> Stream[_T]:
+    """Maps the given function over the given streams.
+
+    Args:
+      func: The function.
+      streams: The streams of the arguments of `func`.
+      executor: Optional. Where to run `func` if it's sync. See `streamify`.
+    """
+    ex = _resolve_executor(executor, func)
 
     class _MappedStream(Stream[_T]):
 
@@ -293,7 +590,13 @@ def map(func, *streams) -> Stream[_T]:
                 args.append(e)
 
             if asyncio.iscoroutinefunction(func):
-                result = await func(*args)
+                async with until_deadline():
+                    result = await func(*args)
+            elif ex:
+                async with until_deadline():
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        ex, func, *args
+                    )
             else:
                 result = func(*args)
 
@@ -301,9 +604,12 @@ def map(func, *streams) -> Stream[_T]:
                 return result, StreamStatus.OK
             return result
 
+        async def aclose(self):
+            await _aclose_all(streams)
+
     return _MappedStream()
 
-# %% ../nbs/00_streams.ipynb 58
+# %% ../nbs/00_streams.ipynb 72
 def filter(
     predicate: Callable[[_T], bool | Awaitable[bool]],
     stream: Stream[_T],
@@ -338,9 +644,12 @@ def filter(
                 return e, StreamStatus.OK
             return e
 
+        async def aclose(self):
+            await stream.aclose()
+
     return _FilterdStream()
 
-# %% ../nbs/00_streams.ipynb 63
+# %% ../nbs/00_streams.ipynb 77
 def zip(*streams: Stream) -> Stream[tuple[Any, ...]]:
 
     class _ZippedStream(Stream[tuple[_T]]):
@@ -360,17 +669,22 @@ def zip(*streams: Stream) -> Stream[tuple[Any, ...]]:
                 return tuple(items), StreamStatus.OK
             return tuple(items)
 
+        async def aclose(self):
+            await _aclose_all(streams)
+
     return _ZippedStream()
 
-# %% ../nbs/00_streams.ipynb 67
+# %% ../nbs/00_streams.ipynb 81
 def fork(s: Stream[_T], n: int) -> Sequence[Stream[_T]]:
     """Make n copies of the given stream.
 
     The elements are copied by reference, so the streams share the same elements.
-    The original stream must not be used after forking.
+    The original stream must not be used after forking. It's closed once all the
+    copies are closed.
     """
 
     buffs = [collections.deque() for _ in range(n)]
+    closed = set()
 
     class _ForkedStream(Stream[_T]):
 
@@ -396,11 +710,183 @@ def fork(s: Stream[_T], n: int) -> Sequence[Stream[_T]]:
                 return None, status
 
             for i, buff in enumerate(buffs):
-                if i != self._idx:
+                if i != self._idx and i not in closed:
                     buff.append(e)
 
             if with_status:
                 return e, StreamStatus.OK
             return e
 
+        async def aclose(self):
+            closed.add(self._idx)
+            buffs[self._idx].clear()
+            if len(closed) == n:
+                await s.aclose()
+
     return [_ForkedStream(i) for i in range(n)]
+
+# %% ../nbs/00_streams.ipynb 85
+def take(s: Stream[_T], n: int) -> Stream[_T]:
+    """Returns the first `n` elements of the stream, and closes it."""
+
+    class _TakeStream(Stream[_T]):
+
+        def __init__(self):
+            self._left = n
+
+        async def next(
+            self,
+            with_status: bool = False,
+        ) -> _T | None:
+            e, status = None, StreamStatus.SHUTDOWN
+            if self._left > 0:
+                e, status = await s.next(with_status=True)
+                if status == StreamStatus.OK:
+                    self._left -= 1
+            if not self._left:
+                # Close as soon as the last element is read.
+                await s.aclose()
+
+            if with_status:
+                return e, status
+            return e
+
+        async def aclose(self):
+            await s.aclose()
+
+    return _TakeStream()
+
+
+def take_until(
+    predicate: Callable[[_T], bool | Awaitable[bool]],
+    s: Stream[_T],
+) -> Stream[_T]:
+    """Returns the elements of the stream up to the first one satisfying `predicate`, included.
+
+    Args:
+      predicate: A function or a coroutine that returns a boolean value.
+        If True, the element is the last one and the stream is closed.
+      s: The stream.
+    """
+
+    class _TakeUntilStream(Stream[_T]):
+
+        def __init__(self):
+            self._done = False
+
+        async def next(
+            self,
+            with_status: bool = False,
+        ) -> _T | None:
+            e, status = None, StreamStatus.SHUTDOWN
+            if not self._done:
+                e, status = await s.next(with_status=True)
+                if status == StreamStatus.OK:
+                    if asyncio.iscoroutinefunction(predicate):
+                        self._done = await predicate(e)
+                    else:
+                        self._done = predicate(e)
+                    if self._done:
+                        await s.aclose()
+
+            if with_status:
+                return e, status
+            return e
+
+        async def aclose(self):
+            await s.aclose()
+
+    return _TakeUntilStream()
+
+
+def timeout(s: Stream[_T], seconds: float) -> Stream[_T]:
+    """Returns the elements of the stream read within `seconds`, then closes it.
+
+    Unlike `deadline`, the stream ends instead of failing.
+    """
+    end = time.monotonic() + seconds
+
+    class _TimeoutStream(Stream[_T]):
+
+        async def next(
+            self,
+            with_status: bool = False,
+        ) -> _T | None:
+            cm = asyncio.timeout(end - time.monotonic())
+            try:
+                async with cm:
+                    e, status = await s.next(with_status=True)
+            except TimeoutError:
+                if not cm.expired():
+                    raise
+                await s.aclose()
+                e, status = None, StreamStatus.SHUTDOWN
+
+            if with_status:
+                return e, status
+            return e
+
+        async def aclose(self):
+            await s.aclose()
+
+    return _TimeoutStream()
+
+
+async def _first(streams: Sequence[Stream[_T]]) -> tuple[Stream[_T] | None, _T | None]:
+    """Returns the first stream to produce an element, and its element. Closes the others."""
+    reads = {asyncio.ensure_future(s.next(with_status=True)): s for s in streams}
+    winner, e = None, None
+    try:
+        while reads and winner is None:
+            done, _ = await asyncio.wait(reads, return_when=asyncio.FIRST_COMPLETED)
+            # Breaks the ties by the order of the streams.
+            for t in sorted(done, key=lambda t: streams.index(reads[t])):
+                s = reads.pop(t)
+                item, status = t.result()
+                if winner is None and status == StreamStatus.OK:
+                    winner, e = s, item
+    finally:
+        for t in reads:
+            t.cancel()
+        await _aclose_all(s for s in streams if s is not winner)
+    return winner, e
+
+
+def race(*streams: Stream[_T]) -> Stream[_T]:
+    """Returns the first stream to produce an element, and closes the others.
+
+    For example, to use the fastest of several models. The streams ending
+    without elements are out of the race.
+    """
+
+    class _RaceStream(Stream[_T]):
+
+        def __init__(self):
+            self._started = False
+            self._winner = None
+
+        async def next(
+            self,
+            with_status: bool = False,
+        ) -> _T | None:
+            if not self._started:
+                self._started = True
+                self._winner, e = await _first(streams)
+                status = StreamStatus.OK if self._winner else StreamStatus.SHUTDOWN
+            elif self._winner:
+                e, status = await self._winner.next(with_status=True)
+            else:
+                e, status = None, StreamStatus.SHUTDOWN
+
+            if with_status:
+                return e, status
+            return e
+
+        async def aclose(self):
+            if self._winner:
+                await self._winner.aclose()
+            elif not self._started:
+                self._started = True
+                await _aclose_all(streams)
+
+    return _RaceStream()
@@ -3,7 +3,8 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02_transforms.ipynb.
 
 # %% auto 0
-__all__ = ['Transform', 'ParDo', 'as_transform', 'SeqDo', 'CancelPrev', 'Event', 'Streamable', 'use_sink', 'cur_sink', 'tfn']
+__all__ = ['Transform', 'ParDo', 'as_transform', 'SeqDo', 'CancelPrev', 'Debounce', 'Throttle', 'Sample', 'Dedup', 'Event',
+           'Streamable', 'use_sink', 'cur_sink', 'tfn']
 
 # %% ../nbs/02_transforms.ipynb 3
 import abc
@@ -11,14 +12,26 @@ import asyncio
 import time
 import uuid
 import inspect
+import math
 import contextlib
 import contextvars
 import dataclasses
-from typing import Any, Callable, ParamSpec, Protocol, Generic, TypeVar, Awaitable
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Literal,
+    ParamSpec,
+    Protocol,
+    Generic,
+    TypeVar,
+    Awaitable,
+)
 import functools
+import weakref
 
-from fastcore.basics import patch
-
+import fastagent_hacking.metrics as mx
+import fastagent_hacking.profiler as px
 import fastagent_hacking.streams as sx
 import fastagent_hacking.channels as cx
 
@@ -36,19 +49,83 @@ class Transform(abc.ABC, Generic[_I, _O]):
 # %% ../nbs/02_transforms.ipynb 8
 # FIXME: Move this to a separate module.
 def _print_task_errors(task: asyncio.Task):
-    if task.exception():
+    if not task.cancelled() and task.exception():
         task.print_stack()
         print(f"Task failed with exception: {task.exception()}")
 
-# %% ../nbs/02_transforms.ipynb 10
+# %% ../nbs/02_transforms.ipynb 9
+def _stage_name(fn: Callable) -> str:
+    """Returns a readable name of `fn` for the metrics."""
+    # `tfn` objects only have a qualified name on their `__call__`.
+    for f in (fn, getattr(fn, "__call__", None)):
+        if name := getattr(f, "__qualname__", None):
+            return name
+    return type(fn).__name__
+
+
+def _traced(
+    fn: Callable,
+    rec: mx.Recorder,
+    *,
+    stage: str,
+    p: cx.Packet,
+    executor: sx.Executor | None = None,
+) -> Callable:
+    """Wraps `fn` to record the processing of the packet `p` by `stage`. See `metrics`."""
+
+    async def traced(x):
+        rec.count(f"{stage}.packets")
+        span = rec.start_span(stage, span_id=p.packet_id, parent_id=p.parent_packet_id)
+        start = time.perf_counter()
+        s, cncl = sx.streamify(
+            fn, return_shutdown_fn=True, name=stage, executor=executor
+        )(x)
+        n, cancelled = 0, False
+        try:
+            async for e in s:
+                if not n:
+                    rec.observe(f"{stage}.ttfi_s", time.perf_counter() - start)
+                n += 1
+                yield e
+        except (asyncio.CancelledError, GeneratorExit):
+            cancelled = True
+            raise
+        finally:
+            cncl()
+            rec.count(f"{stage}.items", n)
+            rec.observe(f"{stage}.latency_s", time.perf_counter() - start)
+            rec.end_span(span, items=n, cancelled=cancelled)
+
+    return traced
+
+# %% ../nbs/02_transforms.ipynb 11
 import collections
 
 
 class ParDo(Transform[_I, _O]):
-    """Processes each element in the input channel using a user-defined function."""
+    """Processes each element in the input channel using a user-defined function.
+
+    Args:
+      fn: The function processing the payloads.
+      name: Optional. The name of the stage in the metrics. Defaults to the name of `fn`.
+      executor: Optional. Where to run `fn` if it's sync, e.g. "thread" for
+        CPU-heavy functions. See `streamify`.
+      timeout_s: Optional. The latency budget of each packet. Its output is
+        shut down at the deadline. See `sx.deadline`.
+    """
 
-    def __init__(self, fn):  # FIXME: type hint
+    def __init__(
+        self,
+        fn,
+        *,
+        name: str | None = None,
+        executor: sx.Executor | None = None,
+        timeout_s: float | None = None,
+    ):  # FIXME: type hint
         self._fn = fn
+        self._name = name or _stage_name(fn)
+        self._executor = executor
+        self._timeout_s = timeout_s
 
         # Maintains a mapping from a packet.tag to a list of stream cancellation functions.
         # When a cancellation packet is received, all tasks associated with the tag
@@ -59,8 +136,8 @@ class ParDo(Transform[_I, _O]):
         self._bg_tasks = set()
 
     def __call__(self, chan: cx.Channel[_I]) -> cx.Channel[_O]:
-        main_stream = sx.InMemStreamWriter()
-        side_stream = sx.InMemStreamWriter()
+        main_stream = sx.InMemStreamWriter(name=f"{self._name}.main")
+        side_stream = sx.InMemStreamWriter(name=f"{self._name}.side")
 
         async def proc(chan):
             try:
@@ -71,13 +148,22 @@ class ParDo(Transform[_I, _O]):
                         if p.packet_type == cx.PacketType.CANCELLATION_PACKET:
                             # Cancel all tasks associated with the tag.
                             cncl_tag = p.payload
-                            for cncl in self._cncls_map[cncl_tag]:
-                                cncl()
+                            n = sum(bool(cncl()) for cncl in self._cncls_map[cncl_tag])
                             del self._cncls_map[p.payload]
+                            if mx.recorder and n:
+                                mx.recorder.count(f"{self._name}.cancelled", n)
+                                mx.recorder.observe(
+                                    f"{self._name}.cancel_latency_s",
+                                    time.time() - p.created_at / 1000,
+                                )
                         continue
 
                     s = self._proc_packet(p)
                     await main_stream.put(s)
+            except TimeoutError:
+                # Shuts down at the deadline. See `sx.deadline`.
+                if not sx.deadline_exceeded():
+                    raise
             finally:
                 await main_stream.shutdown()
                 await side_stream.shutdown()
@@ -91,12 +177,21 @@ class ParDo(Transform[_I, _O]):
             sx.interleave(
                 side_stream.readonly(),
                 sx.flatten(main_stream.readonly()),
-            )
+            ),
+            name=self._name,
         )
 
     def _proc_packet(self, p: cx.Packet[_I]) -> sx.Stream[cx.Packet[_O]]:
         assert p.packet_type == cx.PacketType.DATA
-        s, cncl = sx.streamify(self._fn, return_shutdown_fn=True)(p.payload)
+        fn = self._fn
+        if mx.recorder:
+            fn = _traced(
+                fn, mx.recorder, stage=self._name, p=p, executor=self._executor
+            )
+        with sx.deadline(self._timeout_s):
+            s, cncl = sx.streamify(
+                fn, return_shutdown_fn=True, name=self._name, executor=self._executor
+            )(p.payload)
         for tag in p.tags:
             self._cncls_map[tag].append(cncl)
         return sx.map(
@@ -112,7 +207,7 @@ class ParDo(Transform[_I, _O]):
     def _is_passthrough(self, p: cx.Packet) -> bool:
         return p.packet_type != cx.PacketType.DATA
 
-# %% ../nbs/02_transforms.ipynb 11
+# %% ../nbs/02_transforms.ipynb 12
 def as_transform(fn: Callable | Transform) -> Transform:
     """Converts a function of a single argument into a Transform object."""
     if isinstance(fn, Transform):
@@ -120,9 +215,8 @@ def as_transform(fn: Callable | Transform) -> Transform:
 
     return ParDo(fn)
 
-# %% ../nbs/02_transforms.ipynb 12
-@patch
-def __or__(
+# %% ../nbs/02_transforms.ipynb 13
+def _transform_or(
     self: Transform,
     other,
 ) -> Transform:
@@ -136,8 +230,7 @@ def __or__(
     return ComposedTransform()
 
 
-@patch
-def __ror__(
+def _transform_ror(
     self: Transform,
     other,
 ) -> Transform:
@@ -150,18 +243,42 @@ def __ror__(
 
     return ComposedTransform()
 
-# %% ../nbs/02_transforms.ipynb 24
+
+Transform.__or__ = _transform_or
+Transform.__ror__ = _transform_ror
+
+# %% ../nbs/02_transforms.ipynb 28
 class SeqDo(Transform[_I, _O]):
-    """Processes each element in the input channel using a user-defined function."""
+    """Processes each element in the input channel using a user-defined function.
+
+    Args:
+      fn: The async function processing the payloads, or a sync one if an
+        executor is given.
+      name: Optional. The name of the stage in the metrics. Defaults to the name of `fn`.
+      executor: Optional. Where to run `fn` if it's sync. See `streamify`.
+      timeout_s: Optional. The latency budget of each packet. See `ParDo`.
+    """
 
-    def __init__(self, fn):  # FIXME: type hint
-        assert inspect.isasyncgenfunction(fn) or asyncio.iscoroutinefunction(
-            fn
+    def __init__(
+        self,
+        fn,
+        *,
+        name: str | None = None,
+        executor: sx.Executor | None = None,
+        timeout_s: float | None = None,
+    ):  # FIXME: type hint
+        assert (
+            executor
+            or inspect.isasyncgenfunction(fn)
+            or asyncio.iscoroutinefunction(fn)
         ), f"Expected an async function, got {fn}"
         self._fn = fn
+        self._name = name or _stage_name(fn)
+        self._executor = executor
+        self._timeout_s = timeout_s
 
     def __call__(self, chan: cx.Channel[_I]) -> cx.Channel[_O]:
-        writer = sx.InMemStreamWriter()
+        writer = sx.InMemStreamWriter(name=f"{self._name}.main")
 
         async def proc(chan):
             try:
@@ -170,9 +287,21 @@ class SeqDo(Transform[_I, _O]):
                     if self._is_passthrough(p):
                         await writer.put(p)
                         continue
-                    fn = sx.streamify(self._fn)
+                    fn = self._fn
+                    if mx.recorder:
+                        fn = _traced(
+                            fn,
+                            mx.recorder,
+                            stage=self._name,
+                            p=p,
+                            executor=self._executor,
+                        )
+                    with sx.deadline(self._timeout_s):
+                        s = sx.streamify(fn, name=self._name, executor=self._executor)(
+                            p.payload
+                        )
                     # FIXME: This loop blocks side packets from being processed.
-                    async for e in fn(p.payload):
+                    async for e in s:
                         await writer.put(
                             cx.Packet(
                                 payload=e,
@@ -181,17 +310,21 @@ class SeqDo(Transform[_I, _O]):
                                 tags=p.tags,
                             ),
                         )
+            except TimeoutError:
+                # Shuts down at the deadline. See `sx.deadline`.
+                if not sx.deadline_exceeded():
+                    raise
             finally:
                 await writer.shutdown()
 
         asyncio.create_task(proc(chan)).add_done_callback(_print_task_errors)
 
-        return cx.as_chan(writer.readonly())
+        return cx.as_chan(writer.readonly(), name=self._name)
 
     def _is_passthrough(self, p: cx.Packet) -> bool:
         return p.packet_type != cx.PacketType.DATA
 
-# %% ../nbs/02_transforms.ipynb 29
+# %% ../nbs/02_transforms.ipynb 34
 class CancelPrev(Transform[_I, _O]):
     """Cancels previous packets and their derivatives when a new packet arrives.
 
@@ -199,20 +332,30 @@ class CancelPrev(Transform[_I, _O]):
     For example to avoid double texting in a chat application: When I user sends a new message,
     while the previous message is still being processed, we may want to cancel the processing of
     the previous message.
+
+    Args:
+      name: The name of the stage in the metrics.
     """
 
+    def __init__(self, *, name: str = "CancelPrev"):
+        self._name = name
+
     def __call__(self, chan: cx.Channel[_I]) -> cx.Channel[_O]:
-        writer = sx.InMemStreamWriter()
+        writer = sx.InMemStreamWriter(name=f"{self._name}.main")
 
         async def proc(chan):
             abort_tag = ""
             try:
                 async for p in chan:
                     assert isinstance(p, cx.Packet)
+                    if mx.recorder:
+                        mx.recorder.count(f"{self._name}.packets")
 
                     # We broadcast a cancellation packet that targtets the previous
                     # packet and its derivatives.
                     if abort_tag:
+                        if mx.recorder:
+                            mx.recorder.count(f"{self._name}.cancellations")
                         await writer.put(cx.mk_cancellation_packet(tag=abort_tag))
 
                     # Compute a new abort tag for the next packet.
@@ -225,20 +368,208 @@ class CancelPrev(Transform[_I, _O]):
                             tags=(*p.tags, abort_tag),
                         ),
                     )
+            except TimeoutError:
+                # Shuts down at the deadline. See `sx.deadline`.
+                if not sx.deadline_exceeded():
+                    raise
+            finally:
+                await writer.shutdown()
+
+        asyncio.create_task(proc(chan)).add_done_callback(_print_task_errors)
+
+        return cx.as_chan(writer.readonly(), name=self._name)
+
+# %% ../nbs/02_transforms.ipynb 39
+class _Coalesce(Transform[_I, _I]):
+    """Holds the DATA packets, and forwards the latest one when it's due.
+
+    Args:
+      name: The name of the stage in the metrics.
+    """
+
+    def __init__(self, *, name: str):
+        self._name = name
+
+    @abc.abstractmethod
+    def _due(self, *, now: float, started_at: float, emitted_at: float) -> float:
+        """Returns when to forward the latest packet, which arrived at `now`.
+
+        Args:
+          now: The arrival time of the packet.
+          started_at: The time the transform was applied.
+          emitted_at: The time the last packet was forwarded, or -inf.
+        """
+
+    def __call__(self, chan: cx.Channel[_I]) -> cx.Channel[_I]:
+        writer = sx.InMemStreamWriter(name=f"{self._name}.main")
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+
+        async def proc(chan):
+            held, due, emitted_at = None, None, float("-inf")
+            read = None
+            try:
+                while True:
+                    read = read or asyncio.ensure_future(chan.next(with_status=True))
+                    timeout = None if held is None else max(due - loop.time(), 0)
+                    # Readers fail at the deadline. See `sx.deadline`.
+                    async with sx.until_deadline():
+                        done, _ = await asyncio.wait([read], timeout=timeout)
+                    if not done:
+                        await writer.put(held)
+                        held, emitted_at = None, loop.time()
+                        continue
+
+                    p, status = read.result()
+                    read = None
+                    if status == sx.StreamStatus.SHUTDOWN:
+                        break
+                    if p.packet_type != cx.PacketType.DATA:
+                        await writer.put(p)
+                        continue
+
+                    if mx.recorder:
+                        mx.recorder.count(f"{self._name}.packets")
+                        if held is not None:
+                            mx.recorder.count(f"{self._name}.dropped")
+                    now = loop.time()
+                    held, due = p, self._due(
+                        now=now, started_at=started_at, emitted_at=emitted_at
+                    )
+                    if due <= now:
+                        await writer.put(held)
+                        held, emitted_at = None, now
+                if held is not None:
+                    # Forward the last packet at the end of the input.
+                    await writer.put(held)
+            except TimeoutError:
+                # Shuts down at the deadline. See `sx.deadline`.
+                if not sx.deadline_exceeded():
+                    raise
             finally:
+                if read:
+                    read.cancel()
                 await writer.shutdown()
 
         asyncio.create_task(proc(chan)).add_done_callback(_print_task_errors)
 
-        return cx.as_chan(writer.readonly())
+        return cx.as_chan(writer.readonly(), name=self._name)
+
+
+class Debounce(_Coalesce):
+    """Forwards a DATA packet once no other arrived for `delay_s`.
 
-# %% ../nbs/02_transforms.ipynb 33
+    For example, to process a partial input once the user stops typing.
+
+    Args:
+      delay_s: The quiet period after which the latest packet is forwarded.
+      name: The name of the stage in the metrics.
+    """
+
+    def __init__(self, delay_s: float, *, name: str = "Debounce"):
+        super().__init__(name=name)
+        self._delay_s = delay_s
+
+    def _due(self, *, now: float, started_at: float, emitted_at: float) -> float:
+        return now + self._delay_s
+
+
+class Throttle(_Coalesce):
+    """Forwards at most `rate` DATA packets per second.
+
+    A packet is forwarded immediately if the previous one was forwarded more
+    than `1 / rate` seconds ago. Otherwise, the latest packet is forwarded
+    `1 / rate` seconds after the previous one.
+
+    Args:
+      rate: The maximum number of packets per second.
+      name: The name of the stage in the metrics.
+    """
+
+    def __init__(self, rate: float, *, name: str = "Throttle"):
+        if rate <= 0:
+            raise ValueError(f"The rate must be positive, got {rate}")
+        super().__init__(name=name)
+        self._interval_s = 1 / rate
+
+    def _due(self, *, now: float, started_at: float, emitted_at: float) -> float:
+        return emitted_at + self._interval_s
+
+
+class Sample(_Coalesce):
+    """Forwards the latest DATA packet every `interval_s`, if any arrived.
+
+    Args:
+      interval_s: The sampling period.
+      name: The name of the stage in the metrics.
+    """
+
+    def __init__(self, interval_s: float, *, name: str = "Sample"):
+        if interval_s <= 0:
+            raise ValueError(f"The interval must be positive, got {interval_s}")
+        super().__init__(name=name)
+        self._interval_s = interval_s
+
+    def _due(self, *, now: float, started_at: float, emitted_at: float) -> float:
+        ticks = math.floor((now - started_at) / self._interval_s) + 1
+        return started_at + ticks * self._interval_s
+
+# %% ../nbs/02_transforms.ipynb 48
+class Dedup(Transform[_I, _I]):
+    """Drops the DATA packets already seen.
+
+    Args:
+      key: "id" for the replays of the same packet, "payload" for the packets with
+        the same payload derived from the same packet, or a function of the packet.
+        See `channels.dedup_key`.
+      index: Optional. Records the keys seen. Defaults to the last 100k keys.
+      name: The name of the stage in the metrics.
+    """
+
+    def __init__(
+        self,
+        key: Literal["id", "payload"] | Callable[[cx.Packet], Hashable] = "id",
+        *,
+        index: cx.DedupIndex | None = None,
+        name: str = "Dedup",
+    ):
+        self._key = key if callable(key) else functools.partial(cx.dedup_key, by=key)
+        self._index = index if index is not None else cx.ExactIndex()
+        self._name = name
+
+    def __call__(self, chan: cx.Channel[_I]) -> cx.Channel[_I]:
+        writer = sx.InMemStreamWriter(name=f"{self._name}.main")
+
+        async def proc(chan):
+            try:
+                async for p in chan:
+                    assert isinstance(p, cx.Packet)
+                    if p.packet_type == cx.PacketType.DATA and not self._index.add(
+                        self._key(p)
+                    ):
+                        if mx.recorder:
+                            mx.recorder.count(f"{self._name}.duplicates")
+                        continue
+                    if mx.recorder:
+                        mx.recorder.count(f"{self._name}.packets")
+                        mx.recorder.high_water_mark(
+                            f"{self._name}.index_bytes", self._index.nbytes
+                        )
+                    await writer.put(p)
+            finally:
+                await writer.shutdown()
+
+        asyncio.create_task(proc(chan)).add_done_callback(_print_task_errors)
+
+        return cx.as_chan(writer.readonly(), name=self._name)
+
+# %% ../nbs/02_transforms.ipynb 52
 @dataclasses.dataclass(frozen=True)
 class Event:
     payload: Any
     src: str = ""
 
-# %% ../nbs/02_transforms.ipynb 34
+# %% ../nbs/02_transforms.ipynb 53
 _R = TypeVar("_R")
 _P = ParamSpec("_P")
 
@@ -251,7 +582,7 @@ class Streamable(Protocol[_P, _R]):
 
     def __or__(self, other) -> Transform: ...
 
-# %% ../nbs/02_transforms.ipynb 35
+# %% ../nbs/02_transforms.ipynb 54
 _sink_ctxvar = contextvars.ContextVar("_sink_contextvar", default=None)
 
 
@@ -267,7 +598,7 @@ def use_sink(sink: sx.StreamWriter):
 def cur_sink() -> sx.StreamWriter | None:
     return _sink_ctxvar.get()
 
-# %% ../nbs/02_transforms.ipynb 36
+# %% ../nbs/02_transforms.ipynb 55
 # FIXME How to improve the type hinting for decorated @tfn functions? (e.g., keep their signature).
 
 
@@ -276,34 +607,60 @@ def tfn(fn: Callable[..., Awaitable[_R]]) -> Streamable:
         fn
     ), "tfn can only be used with async functions or async generators"
 
+    # The call metadata is computed once, as `inspect.signature` is slow.
+    takes_sink = "sink" in inspect.signature(fn).parameters
+    is_gen = inspect.isasyncgenfunction(fn)
+    name = fn.__qualname__
+
     class _S(Streamable):
 
-        def __init__(self):
-            self._instance = None
+        def __init__(self, instance: Callable[[], Any] | None = None):
+            # Returns the instance of a bound method.
+            self._instance = instance
+            # The bound wrappers of a decorated method, by instance.
+            self._bound = weakref.WeakKeyDictionary() if instance is None else None
+            if not is_gen:
+                inspect.markcoroutinefunction(self)
 
         def __get__(self, instance, owner):
-            """Ensure correct binding for instance methods."""
-            if instance:
-                self._instance = instance
-            return self
+            """Binds instance methods.
+
+            Each instance gets its own bound wrapper, created on its first lookup and
+            cached by the descriptor. The wrappers only hold their instance weakly, so
+            instances are freed as usual, and copies get their own wrapper. Like
+            `weakref.WeakMethod`, a wrapper doesn't keep its instance alive.
+            """
+            if instance is None or self._instance is not None:
+                return self
+            try:
+                bound = self._bound.get(instance)
+            except TypeError:
+                # Unhashable instances, or without weak references, are bound on each lookup.
+                return _S(lambda: instance)
+            if bound is None:
+                bound = self._bound[instance] = _S(weakref.ref(instance))
+            return bound
+
+        def _bind(self, args: tuple) -> tuple:
+            """Prepends the instance of a bound method to `args`."""
+            if self._instance is None:
+                return args
+            instance = self._instance()
+            if instance is None:
+                raise ReferenceError(f"The instance of {name} was deleted.")
+            return (instance, *args)
 
         # TODO: Factor out the common code between __call__s.
-        if inspect.isasyncgenfunction(fn):
+        if is_gen:
 
             @functools.wraps(fn)
             async def __call__(self, *args, **kwargs):
                 """Handles async generators"""
                 sink = kwargs.pop("sink", None)
-                if not sink:
-                    sink = cur_sink()
-
-                if "sink" in inspect.signature(fn).parameters:
-                    kwargs["sink"] = sink
-
-                if self._instance:
-                    # This required for decorated instance methods.
-                    args = (self._instance, *args)
+                if takes_sink:
+                    kwargs["sink"] = sink or cur_sink()
 
+                args = self._bind(args)
                 async for e in fn(*args, **kwargs):
                     yield e  # Async generator case
 
@@ -313,37 +670,53 @@ def tfn(fn: Callable[..., Awaitable[_R]]) -> Streamable:
             async def __call__(self, *args, **kwargs):
                 """Handles normal async functions"""
                 sink = kwargs.pop("sink", None)
-                if not sink:
-                    sink = cur_sink()
-
-                if "sink" in inspect.signature(fn).parameters:
-                    kwargs["sink"] = sink
-
-                if self._instance:
-                    # This required for decorated instance methods.
-                    args = (self._instance, *args)
+                if takes_sink:
+                    kwargs["sink"] = sink or cur_sink()
 
-                return await fn(*args, **kwargs)  # Normal async function case
+                args = self._bind(args)
+                if sx.cur_deadline() is None:
+                    return await fn(*args, **kwargs)  # Normal async function case
+                async with sx.until_deadline():
+                    return await fn(*args, **kwargs)
 
         def stream(self, *args, return_value: bool = False, **kwargs):
-            """Returns a streamable version of the function."""
-            sink = sx.InMemStreamWriter()
+            """Returns a streamable version of the function.
+
+            The function runs in a background task, which is cancelled when the
+            returned stream is closed (see `aclose`), and stops at the deadline of
+            the calling context (see `sx.deadline`).
+            """
+            sink = sx.InMemStreamWriter(name=name)
             with use_sink(sink):
 
                 async def target():
                     nonlocal sink
+                    rec = mx.recorder
+                    span = rec.start_span(name) if rec else None
+                    cancelled = False
                     try:
-                        result = await self(
+                        coro = self(
                             *args, **kwargs, sink=sink
                         )  # FIXME Should we overwrite chan if already passed?
+                        if prof := px.profiler:
+                            coro = prof.timed(name, coro)
+                        result = await coro
                         if return_value:
                             await sink.put(result)
+                    except asyncio.CancelledError:
+                        cancelled = True
+                        raise
+                    except TimeoutError:
+                        if not sx.deadline_exceeded():
+                            raise
                     finally:
                         await sink.shutdown()
+                        if span:
+                            rec.end_span(span, cancelled=cancelled)
 
-                # TODO: We probably need a task cleanup.
-                asyncio.create_task(target()).add_done_callback(_print_task_errors)
-                return sink.readonly()
+                t = asyncio.create_task(target())
+                t.add_done_callback(_print_task_errors)
+                return sx._TaskStream(sink.readonly(), t)
 
         def __or__(self, other) -> Transform:
             t1, t2 = as_transform(self), as_transform(other)
@@ -353,8 +726,4 @@ def tfn(fn: Callable[..., Awaitable[_R]]) -> Streamable:
             t2, t1 = as_transform(self), as_transform(other)
             return t1 | t2
 
-    wrapped = _S()
-    if asyncio.iscoroutinefunction(fn):
-        inspect.markcoroutinefunction(wrapped)
-
-    return wrapped
+    return _S()
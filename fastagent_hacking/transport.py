@@ -0,0 +1,308 @@
+"""Channels over sockets, to run stages in other processes or hosts."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/13_transport.ipynb.
+
+# %% auto 0
+__all__ = ['Address', 'encode_packet', 'decode_packet', 'SocketChannelWriter', 'connect', 'serve', 'serve_transform',
+           'RemoteTransform']
+
+# %% ../nbs/13_transport.ipynb 3
+import asyncio
+import json
+import struct
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import fastagent_hacking.streams as sx
+import fastagent_hacking.channels as cx
+import fastagent_hacking.transforms as tx
+import fastagent_hacking.codec as codec
+import fastagent_hacking.llms as lx
+
+# %% ../nbs/13_transport.ipynb 8
+_FRAME_SIZE = struct.Struct("<I")
+_HEADER = struct.Struct("<BBidHHH")
+_TAG_SIZE = struct.Struct("<H")
+_MAX_SIZE = 0xFFFF
+# The header flags.
+_HAS_PARENT = 1
+
+_PACKET_TYPES = list(cx.PacketType)
+_PACKET_TYPE_IDS = {t: i for i, t in enumerate(_PACKET_TYPES)}
+
+_JSON, _BYTES, _MSG = 0, 1, 2
+
+
+def _encode_payload(payload: Any) -> bytes:
+    if isinstance(payload, bytes):
+        return bytes([_BYTES]) + payload
+    if isinstance(payload, (lx.Msg, lx.MsgChunk)):
+        return bytes([_MSG]) + codec.encode(payload)
+    try:
+        return bytes([_JSON]) + json.dumps(payload, separators=(",", ":")).encode()
+    except TypeError as e:
+        raise ValueError(
+            f"Cannot serialize payload {payload!r} with type {type(payload)}"
+        ) from e
+
+
+def _decode_payload(buf: memoryview) -> Any:
+    kind = buf[0] if len(buf) else None
+    if kind == _JSON:
+        return json.loads(str(buf[1:], "utf-8"))
+    if kind == _BYTES:
+        return bytes(buf[1:])
+    if kind == _MSG:
+        return codec.decode(buf[1:])
+    raise ValueError(f"Invalid payload kind: {kind}")
+
+
+def _check_size(what: str, size: int):
+    if size > _MAX_SIZE:
+        raise ValueError(
+            f"Cannot serialize a packet with {size} {what}, the limit is {_MAX_SIZE}"
+        )
+
+
+def encode_packet(p: cx.Packet) -> bytes:
+    """Serializes a packet into a single frame.
+
+    The JSON payloads are decoded as JSON values, e.g. the tuples as lists.
+    """
+    packet_id = p.packet_id.encode()
+    parent_id = b"" if p.parent_packet_id is None else p.parent_packet_id.encode()
+    _check_size("bytes of id", len(packet_id))
+    _check_size("bytes of parent id", len(parent_id))
+    _check_size("tags", len(p.tags))
+    parts = [
+        b"",
+        _HEADER.pack(
+            _PACKET_TYPE_IDS[p.packet_type],
+            0 if p.parent_packet_id is None else _HAS_PARENT,
+            p.priority,
+            p.created_at,
+            len(packet_id),
+            len(parent_id),
+            len(p.tags),
+        ),
+        packet_id,
+        parent_id,
+    ]
+    for tag in p.tags:
+        tag = tag.encode()
+        _check_size("bytes of tag", len(tag))
+        parts.append(_TAG_SIZE.pack(len(tag)))
+        parts.append(tag)
+    parts.append(_encode_payload(p.payload))
+
+    parts[0] = _FRAME_SIZE.pack(sum(len(part) for part in parts))
+    return b"".join(parts)
+
+
+def _decode_frame(buf: memoryview) -> cx.Packet:
+    type_id, flags, priority, created_at, id_size, parent_size, n_tags = (
+        _HEADER.unpack_from(buf)
+    )
+    pos = _HEADER.size
+    packet_id = str(buf[pos : pos + id_size], "utf-8")
+    pos += id_size
+    parent_id = None
+    if flags & _HAS_PARENT:
+        parent_id = str(buf[pos : pos + parent_size], "utf-8")
+    pos += parent_size
+
+    tags = []
+    for _ in range(n_tags):
+        [size] = _TAG_SIZE.unpack_from(buf, pos)
+        pos += _TAG_SIZE.size
+        tags.append(str(buf[pos : pos + size], "utf-8"))
+        pos += size
+
+    return cx.Packet(
+        payload=_decode_payload(buf[pos:]),
+        packet_type=_PACKET_TYPES[type_id],
+        packet_id=packet_id,
+        parent_packet_id=parent_id,
+        created_at=created_at,
+        priority=priority,
+        tags=tuple(tags),
+    )
+
+
+def decode_packet(data: bytes) -> cx.Packet:
+    """Deserializes a packet from a single frame."""
+    buf = memoryview(data)
+    [size] = _FRAME_SIZE.unpack_from(buf)
+    if size != len(buf) - _FRAME_SIZE.size:
+        raise ValueError(
+            f"Invalid frame size: {size}, expected {len(buf) - _FRAME_SIZE.size}"
+        )
+    return _decode_frame(buf[_FRAME_SIZE.size :])
+
+# %% ../nbs/13_transport.ipynb 14
+Address = str | tuple[str, int]
+
+
+async def _read_packets(reader: asyncio.StreamReader) -> AsyncIterator[cx.Packet]:
+    while True:
+        try:
+            header = await reader.readexactly(_FRAME_SIZE.size)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise ValueError("Truncated frame header") from e
+            return  # The peer is done writing.
+        except ConnectionResetError:
+            return
+        [size] = _FRAME_SIZE.unpack(header)
+        yield _decode_frame(memoryview(await reader.readexactly(size)))
+
+
+class SocketChannelWriter(cx.ChannelWriter):
+    """Writes packets to a socket connection, and reads the packets of the peer.
+
+    Args:
+      reader: The reading half of the connection.
+      writer: The writing half of the connection.
+      name: The name of the read channel in the metrics. See `metrics`.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        *,
+        name: str = "socket",
+    ):
+        self._reader = reader
+        self._writer = writer
+        self._name = name
+        self._chan = None
+        self._sent_eof = self._got_eof = False
+
+    async def put(self, *packets: cx.Packet):
+        assert all(isinstance(p, cx.Packet) for p in packets)
+        self._writer.write(b"".join(encode_packet(p) for p in packets))
+        # Waits while the peer is slower than us.
+        await self._writer.drain()
+
+    async def shutdown(self):
+        """Tells the peer that no more packets will be written."""
+        if self._sent_eof or self._writer.is_closing():
+            return
+        self._sent_eof = True
+        if self._writer.can_write_eof():
+            self._writer.write_eof()
+        await self._maybe_close()
+
+    def readonly(self) -> cx.Channel:
+        """Returns the channel of the packets written by the peer."""
+        if self._chan is None:
+
+            async def read():
+                try:
+                    async for p in _read_packets(self._reader):
+                        yield p
+                finally:
+                    self._got_eof = True
+                    await self._maybe_close()
+
+            self._chan = cx.as_chan(sx.of(read()), name=self._name)
+        return self._chan
+
+    async def _maybe_close(self):
+        # The connection is closed once both peers are done writing.
+        if self._sent_eof and self._got_eof:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def connect(address: Address, *, name: str = "socket") -> SocketChannelWriter:
+    """Opens a connection to a channel server. See `serve`."""
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    return SocketChannelWriter(reader, writer, name=name)
+
+
+async def serve(
+    handler: Callable[[SocketChannelWriter], Awaitable[None]],
+    address: Address,
+    *,
+    name: str = "socket",
+) -> asyncio.Server:
+    """Starts a server calling `handler` with each connection.
+
+    Args:
+      handler: Processes a connection.
+      address: The address to listen on. With TCP, port 0 picks a free port,
+        see `server.sockets[0].getsockname()`.
+      name: The name of the read channels in the metrics.
+    """
+
+    async def handle(reader, writer):
+        await handler(SocketChannelWriter(reader, writer, name=name))
+
+    if isinstance(address, str):
+        return await asyncio.start_unix_server(handle, address)
+    return await asyncio.start_server(handle, *address)
+
+# %% ../nbs/13_transport.ipynb 17
+async def serve_transform(
+    t: tx.Transform, address: Address, **kwargs
+) -> asyncio.Server:
+    """Starts a server applying `t` to the channel of each connection. See `serve`."""
+
+    async def handler(conn: SocketChannelWriter):
+        try:
+            async for p in t(conn.readonly()):
+                await conn.put(p)
+        except ConnectionError:
+            pass  # The client is gone.
+        finally:
+            await conn.shutdown()
+
+    return await serve(handler, address, **kwargs)
+
+
+class RemoteTransform(tx.Transform):
+    """A transform running on a server. See `serve_transform`.
+
+    Args:
+      address: The address of the server. Each call opens a connection.
+      name: The name of the output channels in the metrics.
+    """
+
+    def __init__(self, address: Address, *, name: str = "remote"):
+        self._address = address
+        self._name = name
+        self._bg_tasks = set()
+
+    def __call__(self, chan: cx.Channel) -> cx.Channel:
+        connected = asyncio.get_running_loop().create_future()
+
+        async def send():
+            try:
+                conn = await connect(self._address, name=self._name)
+            except Exception as e:
+                connected.set_exception(e)
+                raise
+            connected.set_result(conn)
+            try:
+                async for p in chan:
+                    await conn.put(p)
+            finally:
+                await conn.shutdown()
+
+        async def recv():
+            conn = await connected
+            async for p in conn.readonly():
+                yield p
+
+        t = asyncio.create_task(send())
+        self._bg_tasks.add(t)
+        t.add_done_callback(self._bg_tasks.discard)
+        t.add_done_callback(tx._print_task_errors)
+        return cx.as_chan(sx.of(recv()), name=self._name)